@@ -0,0 +1,31 @@
+from django.db.backends.postgresql import base
+
+from api.backends.postgresql_pool.pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Бэкенд PostgreSQL, который берет соединения из пула процесса
+    и возвращает их в пул вместо закрытия. Параметры пула задаются
+    в ключе POOL настроек базы данных.
+    """
+    pool = None
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self.alias, conn_params,
+                             self.settings_dict.get('POOL', {}))
+        connection = self.pool.acquire(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+        )
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            self.pool.release(self.connection,
+                              discard=self.errors_occurred)
@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+from prometheus_client import Counter, Gauge
+
+CONNECTIONS = Gauge(
+    'yamdb_db_pool_connections',
+    'Соединения в пуле по состоянию',
+    ('alias', 'state'),
+    multiprocess_mode='livesum',
+)
+EVENTS = Counter(
+    'yamdb_db_pool_events_total',
+    'События пула соединений',
+    ('alias', 'event'),
+)
+
+pools = {}
+pools_lock = threading.Lock()
+abandoned = []
+
+
+class ConnectionPool:
+    """Пул соединений с PostgreSQL одного процесса.
+    Хранит не больше max_size открытых соединений; свободные соединения
+    старше idle_timeout секунд закрываются, а пролежавшие без дела
+    дольше check_interval секунд перед выдачей проверяются запросом.
+    Если все соединения заняты, ждет освобождения не дольше timeout
+    секунд.
+    """
+
+    def __init__(self, alias, max_size, idle_timeout, check_interval,
+                 timeout):
+        self.alias = alias
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self.condition = threading.Condition()
+        self.idle = []
+        self.size = 0
+        self.stats = dict.fromkeys(
+            ('created', 'reused', 'discarded', 'waits', 'timeouts'), 0
+        )
+
+    def event(self, name):
+        self.stats[name] += 1
+        EVENTS.labels(self.alias, name).inc()
+
+    def publish(self):
+        CONNECTIONS.labels(self.alias, 'idle').set(len(self.idle))
+        CONNECTIONS.labels(self.alias, 'in_use').set(
+            self.size - len(self.idle)
+        )
+
+    def get_stats(self):
+        with self.condition:
+            return dict(self.stats, size=self.size, idle=len(self.idle),
+                        in_use=self.size - len(self.idle))
+
+    def prune(self):
+        """Закрывает свободные соединения старше idle_timeout.
+        Вызывается под блокировкой; самые старые лежат в начале списка.
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        while self.idle and self.idle[0][1] < deadline:
+            connection, _ = self.idle.pop(0)
+            self.close(connection)
+
+    def close(self, connection):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        self.size -= 1
+        self.event('discarded')
+        self.condition.notify()
+
+    def take(self):
+        """Свободное соединение и время его возврата в пул либо
+        (None, None), если можно открыть новое соединение.
+        """
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        with self.condition:
+            while True:
+                self.prune()
+                if self.idle:
+                    return self.idle.pop()
+                if self.size < self.max_size:
+                    self.size += 1
+                    return None, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.event('timeouts')
+                    raise psycopg2.OperationalError(
+                        f'Нет свободных соединений в пуле {self.alias} '
+                        f'за {self.timeout} с'
+                    )
+                if not waited:
+                    waited = True
+                    self.event('waits')
+                self.condition.wait(remaining)
+
+    def is_healthy(self, connection, released):
+        if connection.closed:
+            return False
+        if time.monotonic() - released < self.check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def acquire(self, connect):
+        """Выдает проверенное свободное соединение или открывает новое
+        функцией connect.
+        """
+        while True:
+            connection, released = self.take()
+            if connection is None:
+                break
+            if self.is_healthy(connection, released):
+                with self.condition:
+                    self.event('reused')
+                    self.publish()
+                return connection
+            with self.condition:
+                self.close(connection)
+        try:
+            connection = connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.event('created')
+            self.publish()
+        return connection
+
+    def release(self, connection, discard=False):
+        """Возвращает соединение в пул, откатив незавершенную
+        транзакцию; сломанное соединение закрывается.
+        """
+        if not discard and not connection.closed:
+            status = connection.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    discard = True
+        with self.condition:
+            if discard or connection.closed:
+                self.close(connection)
+            else:
+                self.idle.append((connection, time.monotonic()))
+                self.condition.notify()
+            self.publish()
+
+
+def get_pool(alias, conn_params, options):
+    """Пул для параметров подключения в текущем процессе.
+    Пулы, унаследованные от родительского процесса при fork, не
+    закрываются и не используются: их соединения принадлежат родителю.
+    """
+    key = (alias, tuple(sorted(conn_params.items())))
+    with pools_lock:
+        pool = pools.get(key)
+        if pool is not None and pool.pid != os.getpid():
+            abandoned.append(pools.pop(key))
+            pool = None
+        if pool is None:
+            pool = pools[key] = ConnectionPool(
+                alias,
+                max_size=options.get('MAX_SIZE', 10),
+                idle_timeout=options.get('IDLE_TIMEOUT', 300),
+                check_interval=options.get('CHECK_INTERVAL', 30),
+                timeout=options.get('TIMEOUT', 10),
+            )
+        return pool
+
+
+def get_pool_stats():
+    """Статистика всех пулов текущего процесса."""
+    with pools_lock:
+        current = [pool for pool in pools.values()
+                   if pool.pid == os.getpid()]
+    return {pool.alias: pool.get_stats() for pool in current}
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.v1.cache import get_stats
+
+
+class Command(BaseCommand):
+    help = 'статистика попаданий в кеш ответов API'
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f'попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {ratio:.1%}'
+        )
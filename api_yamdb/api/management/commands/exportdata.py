@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.v1.export import (DATASETS, DEFAULT_CHUNK_SIZE, EXPORT_FORMATS,
+                           export, parse_moment)
+
+
+class Command(BaseCommand):
+    help = ('потоковая выгрузка произведений, отзывов или комментариев '
+            'в формате NDJSON или CSV')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'dataset',
+            choices=sorted(DATASETS),
+            help='набор данных для выгрузки',
+        )
+        parser.add_argument(
+            '--output',
+            choices=EXPORT_FORMATS,
+            default='ndjson',
+            help='формат выгрузки',
+        )
+        parser.add_argument(
+            '--since',
+            help='начало периода (включительно), дата в формате ISO 8601',
+        )
+        parser.add_argument(
+            '--until',
+            help='конец периода (не включительно), дата в формате ISO 8601',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='количество строк, читаемых из базы данных за раз',
+        )
+        parser.add_argument(
+            '--file',
+            help='файл для выгрузки (по умолчанию - стандартный вывод)',
+        )
+
+    def get_moment(self, value):
+        if value is None:
+            return None
+        try:
+            return parse_moment(value)
+        except ValueError as error:
+            raise CommandError(error)
+
+    def handle(self, *args, **options):
+        chunks = export(
+            options['dataset'],
+            options['output'],
+            self.get_moment(options['since']),
+            self.get_moment(options['until']),
+            options['chunk_size'],
+        )
+        if options['file'] is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['file'], 'w', encoding='utf-8',
+                  newline='') as output:
+            for chunk in chunks:
+                output.write(chunk)
@@ -0,0 +1,47 @@
+import os
+
+from django.http import HttpResponse
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+
+REQUESTS = Counter(
+    'yamdb_http_requests_total',
+    'Количество запросов к API',
+    ('view', 'action', 'method', 'status'),
+)
+LATENCY = Histogram(
+    'yamdb_http_request_duration_seconds',
+    'Время обработки запроса',
+    ('view', 'action'),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+QUERIES = Histogram(
+    'yamdb_http_request_db_queries',
+    'Количество SQL-запросов на один запрос к API',
+    ('view', 'action'),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+CACHE_REQUESTS = Counter(
+    'yamdb_cache_requests_total',
+    'Обращения к кешу ответов API',
+    ('result',),
+)
+
+
+def get_registry():
+    """Реестр метрик. Под gunicorn с несколькими воркерами метрики
+    собираются из файлов всех процессов в каталоге
+    PROMETHEUS_MULTIPROC_DIR.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics(request):
+    """Метрики в текстовом формате Prometheus."""
+    return HttpResponse(generate_latest(get_registry()),
+                        content_type=CONTENT_TYPE_LATEST)
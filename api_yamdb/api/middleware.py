@@ -0,0 +1,213 @@
+import heapq
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from api.metrics import LATENCY, QUERIES, REQUESTS
+
+logger = logging.getLogger('api.performance')
+
+
+def view_labels(view_func, request):
+    """Имя view и действие DRF, например TitleViewSet и list."""
+    view_class = (getattr(view_func, 'cls', None)
+                  or getattr(view_func, 'view_class', None))
+    view = getattr(view_class, '__name__', view_func.__name__)
+    actions = getattr(view_func, 'actions', None) or {}
+    return view, actions.get(request.method.lower(), request.method.lower())
+
+
+class QueryCounter:
+    """Обертка выполнения SQL, которая только считает запросы."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryRecorder:
+    """Обертка выполнения SQL: считает запросы, их общее время
+    и хранит самые медленные из них.
+    """
+
+    def __init__(self, keep):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            item = (duration, self.count, sql)
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, item)
+            elif item > self.slowest[0]:
+                heapq.heapreplace(self.slowest, item)
+
+
+class RequestMetrics:
+    """Замеры одного запроса. Обработка во view без учета SQL
+    в DRF - это в основном сериализация, рендеринг замеряется
+    отдельно от вызова render() до его завершения.
+    """
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.started = time.perf_counter()
+        self.view = None
+        self.action = None
+        self.view_started = None
+        self.view_finished = None
+        self.view_queries = 0.0
+        self.render_started = None
+        self.render_finished = None
+
+    def start_view(self, view_func, request):
+        self.view, self.action = view_labels(view_func, request)
+        self.view_started = time.perf_counter()
+        self.view_queries = self.recorder.duration
+
+    def finish_view(self):
+        if self.view_started is not None and self.view_finished is None:
+            self.view_finished = time.perf_counter()
+            self.view_queries = self.recorder.duration - self.view_queries
+
+    def start_render(self):
+        self.render_started = time.perf_counter()
+
+    def finish_render(self, response):
+        self.render_finished = time.perf_counter()
+        return response
+
+    def timings(self):
+        """Длительности этапов в миллисекундах."""
+        total = time.perf_counter() - self.started
+        timings = {'db': self.recorder.duration}
+        if self.view_finished is not None:
+            timings['serialize'] = max(
+                self.view_finished - self.view_started - self.view_queries, 0
+            )
+        if self.render_finished is not None:
+            timings['render'] = self.render_finished - self.render_started
+        timings['total'] = total
+        return {name: round(value * 1000, 2)
+                for name, value in timings.items()}
+
+
+def server_timing(timings, queries):
+    parts = []
+    for name, duration in timings.items():
+        part = f'{name};dur={duration}'
+        if name == 'db':
+            part += f';desc="{queries} queries"'
+        parts.append(part)
+    return ', '.join(parts)
+
+
+class RequestTimingMiddleware:
+    """Замеряет количество и время SQL-запросов, время сериализации,
+    рендеринга и всего запроса. Результаты выводятся в заголовок
+    Server-Timing и в журнал api.performance строками JSON; запросы
+    сверх REQUEST_QUERY_BUDGET SQL-запросов или REQUEST_TIME_BUDGET
+    миллисекунд записываются с предупреждением и самыми медленными
+    SQL-запросами. Включается настройкой REQUEST_TIMING.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_TIMING:
+            return self.get_response(request)
+        recorder = QueryRecorder(settings.REQUEST_SLOW_SQL_COUNT)
+        request.timing = RequestMetrics(recorder)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        request.timing.finish_view()
+        self.report(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, 'timing'):
+            request.timing.start_view(view_func, request)
+
+    def process_template_response(self, request, response):
+        if hasattr(request, 'timing'):
+            request.timing.finish_view()
+            request.timing.start_render()
+            response.add_post_render_callback(request.timing.finish_render)
+        return response
+
+    def report(self, request, response):
+        metrics = request.timing
+        recorder = metrics.recorder
+        timings = metrics.timings()
+        response['Server-Timing'] = server_timing(timings, recorder.count)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'view': metrics.view,
+            'action': metrics.action,
+            'queries': recorder.count,
+            **{f'{name}_ms': value for name, value in timings.items()},
+        }
+        over_budget = (
+            recorder.count > settings.REQUEST_QUERY_BUDGET
+            or timings['total'] > settings.REQUEST_TIME_BUDGET
+        )
+        if not over_budget:
+            logger.info(json.dumps(record, ensure_ascii=False))
+            return
+        record['slow_queries'] = [
+            {'ms': round(duration * 1000, 2), 'sql': sql}
+            for duration, _, sql in sorted(recorder.slowest, reverse=True)
+        ]
+        logger.warning(json.dumps(record, ensure_ascii=False))
+
+
+class RequestMetricsMiddleware:
+    """Считает запросы по view, действию и статусу ответа, время
+    обработки и количество SQL-запросов для метрик Prometheus.
+    Запросы без найденного view учитываются с view="none", чтобы
+    адреса не попадали в метки. Включается настройкой METRICS_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        view, action = getattr(request, 'metrics_labels', ('none', ''))
+        REQUESTS.labels(view, action, request.method,
+                        response.status_code).inc()
+        LATENCY.labels(view, action).observe(duration)
+        QUERIES.labels(view, action).observe(counter.count)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if settings.METRICS_ENABLED:
+            request.metrics_labels = view_labels(view_func, request)
@@ -0,0 +1,82 @@
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_KEY = 'db-primary-pin:{}'
+PRIMARY_APPS = ('auth', 'contenttypes', 'sessions', 'admin', 'users',
+                'outbox')
+
+replica_alias = ContextVar('replica_alias', default=None)
+
+
+class ReplicaRouter:
+    """Направляет чтение на реплику, выбранную для текущего запроса
+    ReplicaRoutingMiddleware, а запись и миграции - на основную базу.
+    Пользователи и служебные таблицы всегда читаются с основной базы,
+    как и все запросы внутри транзакции и после записи в этом запросе.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = replica_alias.get()
+        if (alias is None or model._meta.app_label in PRIMARY_APPS
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        replica_alias.set(None)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def client_key(request):
+    """Ключ клиента для закрепления за основной базой: токен
+    из заголовка Authorization или сессия.
+    """
+    credentials = (request.META.get('HTTP_AUTHORIZATION')
+                   or request.COOKIES.get(settings.SESSION_COOKIE_NAME))
+    if not credentials:
+        return None
+    return STICKY_KEY.format(hashlib.md5(credentials.encode()).hexdigest())
+
+
+class ReplicaRoutingMiddleware:
+    """Выбирает реплику для GET и HEAD запросов к API v1.
+    После изменяющего запроса клиент на DB_REPLICA_STICKY_SECONDS
+    закрепляется за основной базой, чтобы сразу видеть свои изменения
+    несмотря на отставание реплик.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = replica_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_alias.reset(token)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            key = client_key(request)
+            if key is not None and settings.DB_REPLICAS:
+                cache.set(key, True, settings.DB_REPLICA_STICKY_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (not settings.DB_REPLICAS
+                or request.method not in ('GET', 'HEAD')
+                or not view_func.__module__.startswith('api.v1.')):
+            return
+        key = client_key(request)
+        if key is not None and cache.get(key):
+            return
+        replica_alias.set(random.choice(settings.DB_REPLICAS))
@@ -0,0 +1,46 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import CustomUser
+from users.state import cache_user, get_cached_user, get_user_state
+
+USER_CLAIMS = ('username', 'role')
+
+
+def get_token_for_user(user):
+    """Access-токен с именем и ролью пользователя в claims."""
+    token = AccessToken.for_user(user)
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Аутентификация по JWT без запроса пользователя к базе данных.
+    Пользователь собирается из id в токене и актуальных имени, роли
+    и активности, которые читаются из кеша, а при промахе - из базы
+    данных, поэтому изменения после выдачи токена действуют сразу.
+    Для токенов без claims пользователь кешируется на короткое время.
+    Собранный из claims пользователь не сохраняется в базу данных:
+    содержит только id, имя и роль.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Токен не содержит id пользователя')
+        state = get_user_state(user_id)
+        if not state['is_active']:
+            raise AuthenticationFailed('Пользователь заблокирован',
+                                       code='user_inactive')
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            return CustomUser(pk=user_id, **state)
+        user = get_cached_user(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user)
+        return user
@@ -0,0 +1,166 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.v1.serializers import TitleBulkItemSerializer
+from changes.log import record_objects
+from reviews.models import Category, Genre, Title
+from reviews.versions import bump_versions
+
+BULK_MAX_ITEMS = 1000
+BULK_MODES = ('atomic', 'best_effort')
+
+
+def collect(items, key):
+    """Значения поля key всех элементов пакета, в том числе из списков."""
+    values = set()
+    for item in items:
+        value = item.get(key) if isinstance(item, dict) else None
+        if isinstance(value, list):
+            values.update(v for v in value if isinstance(v, (str, int)))
+        elif isinstance(value, (str, int)):
+            values.add(value)
+    return values
+
+
+class TitleBulkWriter:
+    """Пакетное создание и изменение произведений.
+    Справочники загружаются одним запросом на пакет, произведения
+    и связи с жанрами записываются bulk-запросами в одной транзакции.
+    Изменяемые произведения блокируются в той же транзакции до проверки,
+    поэтому параллельное изменение не будет перезаписано.
+    Элемент с полем id изменяет произведение, без него - создает новое.
+    """
+
+    def __init__(self, items, mode):
+        self.items = items
+        self.mode = mode
+        self.results = [None] * len(items)
+        self.created = []
+        self.updated = []
+
+    def get_context(self):
+        ids = set()
+        for pk in collect(self.items, 'id'):
+            try:
+                ids.add(int(pk))
+            except ValueError:
+                pass
+        return {
+            'genres': {
+                genre.slug: genre for genre in
+                Genre.objects.filter(slug__in=collect(self.items, 'genre'))
+            },
+            'categories': {
+                category.slug: category for category in
+                Category.objects.filter(
+                    slug__in=collect(self.items, 'category'))
+            },
+            'titles': {
+                title.pk: title for title in
+                Title.objects.select_for_update().filter(
+                    pk__in=ids).order_by('pk')
+            },
+        }
+
+    def validate(self):
+        """Проверяет все элементы; возвращает список корректных пар
+        (индекс, данные) и признак наличия ошибок.
+        """
+        context = self.context = self.get_context()
+        seen_ids = set()
+        valid = []
+        for index, item in enumerate(self.items):
+            if not isinstance(item, dict):
+                self.fail(index, {'non_field_errors': ['Ожидается объект']})
+                continue
+            serializer = TitleBulkItemSerializer(
+                data=item, context=context, partial='id' in item
+            )
+            if not serializer.is_valid():
+                self.fail(index, serializer.errors)
+                continue
+            pk = serializer.validated_data.get('id')
+            if pk is not None and pk in seen_ids:
+                self.fail(index, {'id': ['Произведение повторяется в пакете']})
+                continue
+            seen_ids.add(pk)
+            valid.append((index, serializer.validated_data))
+        return valid, len(valid) < len(self.items)
+
+    def fail(self, index, errors):
+        self.results[index] = {'index': index, 'status': 'error',
+                               'errors': errors}
+
+    def save(self, valid):
+        fields = {'modified'}
+        for index, data in valid:
+            genres = data.pop('genre', None)
+            pk = data.pop('id', None)
+            if pk is None:
+                self.created.append((index, Title(**data), genres))
+                continue
+            title = self.context['titles'][pk]
+            for field, value in data.items():
+                setattr(title, field, value)
+            fields.update(data)
+            self.updated.append((index, title, genres))
+        links = []
+        self.create_titles()
+        self.update_titles(fields)
+        for _, title, genres in self.created + self.updated:
+            if genres is not None:
+                links.extend(
+                    Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+                    for genre in genres
+                )
+        Title.genre.through.objects.filter(title_id__in=[
+            title.pk for _, title, genres in self.updated
+            if genres is not None
+        ]).delete()
+        Title.genre.through.objects.bulk_create(links)
+        record_objects([
+            title for _, title, _ in self.created + self.updated
+        ])
+        bump_versions('title')
+
+    def create_titles(self):
+        titles = [title for _, title, _ in self.created]
+        if connection.features.can_return_ids_from_bulk_insert:
+            Title.objects.bulk_create(titles)
+        else:
+            for title in titles:
+                title.save()
+        for index, title, _ in self.created:
+            self.results[index] = {'index': index, 'status': 'created',
+                                   'id': title.pk}
+
+    def update_titles(self, fields):
+        """bulk_update не вызывает сигналы и не обновляет auto_now-поля,
+        поэтому время изменения произведения проставляется явно.
+        """
+        now = timezone.now()
+        titles = [title for _, title, _ in self.updated]
+        for index, title, _ in self.updated:
+            title.modified = now
+            self.results[index] = {'index': index, 'status': 'updated',
+                                   'id': title.pk}
+        Title.objects.bulk_update(titles, fields)
+
+    def run(self):
+        """Выполняет пакет и возвращает признак успешной записи.
+        В режиме atomic любая ошибка отменяет запись всего пакета,
+        в режиме best_effort записываются только корректные элементы;
+        если корректных нет, запись не выполняется.
+        Проверка и запись идут в одной транзакции.
+        """
+        with transaction.atomic():
+            valid, has_errors = self.validate()
+            if not valid:
+                return False
+            if has_errors and self.mode == 'atomic':
+                for index, _ in valid:
+                    self.results[index] = {'index': index,
+                                           'status': 'skipped'}
+                return False
+            self.save(valid)
+        return True
@@ -0,0 +1,99 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.metrics import CACHE_REQUESTS
+from api.routing import replica_alias
+from reviews.versions import changed_within, get_versions
+
+RESPONSE_KEY = 'api-response:{}'
+STATS_KEY = 'api-response-stats:{}'
+
+
+def record(outcome):
+    """Учитывает попадание или промах кеша ответов."""
+    CACHE_REQUESTS.labels(outcome).inc()
+    key = STATS_KEY.format(outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def get_stats():
+    keys = {outcome: STATS_KEY.format(outcome)
+            for outcome in ('hits', 'misses')}
+    values = cache.get_many(keys.values())
+    return {outcome: values.get(key, 0) for outcome, key in keys.items()}
+
+
+def get_user_variant(user):
+    if not user or not user.is_authenticated:
+        return 'anon'
+    return user.role
+
+
+def make_key(request, dependencies):
+    """Ключ кеша: версии данных, адрес, отсортированные параметры запроса
+    и роль пользователя.
+    """
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    raw = '|'.join((
+        ':'.join(str(version) for version in get_versions(*dependencies)),
+        request.build_absolute_uri(request.path),
+        query,
+        get_user_variant(request.user),
+    ))
+    return RESPONSE_KEY.format(hashlib.md5(raw.encode()).hexdigest())
+
+
+class ResponseCacheMixin:
+    """Кеширует данные успешных ответов на чтение.
+    Кеш сбрасывается увеличением версий моделей из cache_dependencies,
+    нулевой RESPONSE_CACHE_TIMEOUT отключает кеширование.
+    Ответ, прочитанный с реплики вскоре после изменения данных,
+    не кешируется: реплика могла еще не получить изменение.
+    """
+    cache_dependencies = ()
+
+    def is_cacheable(self, response):
+        if response.status_code != status.HTTP_200_OK:
+            return False
+        return replica_alias.get() is None or not changed_within(
+            self.cache_dependencies, settings.DB_REPLICA_STICKY_SECONDS
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_TIMEOUT:
+            return handler(request, *args, **kwargs)
+        key = make_key(request, self.cache_dependencies)
+        data = cache.get(key)
+        if data is not None:
+            record('hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        record('misses')
+        response = handler(request, *args, **kwargs)
+        if self.is_cacheable(response):
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedListMixin(ResponseCacheMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(ResponseCacheMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
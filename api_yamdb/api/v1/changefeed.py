@@ -0,0 +1,123 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from api.v1.serializers import (CategorySerializer, CommentSerializer,
+                                GenreSerializer, ReviewSerializer,
+                                TitleListSerializer)
+from changes.models import Change
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+def parse_token(value):
+    """Номер записи журнала из токена синхронизации; без токена лента
+    начинается с начала журнала.
+    """
+    if not value:
+        return 0
+    if not value.isdigit():
+        raise ValueError(f'Неверный токен: {value}')
+    return int(value)
+
+
+def load_titles(keys):
+    titles = Title.objects.filter(pk__in=keys).select_related(
+        'category'
+    ).prefetch_related('genre')
+    return {str(title.pk): data for title, data in zip(
+        titles, TitleListSerializer(titles, many=True).data
+    )}
+
+
+def load_genres(keys):
+    genres = Genre.objects.filter(slug__in=keys)
+    return {genre.slug: data for genre, data in zip(
+        genres, GenreSerializer(genres, many=True).data
+    )}
+
+
+def load_categories(keys):
+    categories = Category.objects.filter(slug__in=keys)
+    return {category.slug: data for category, data in zip(
+        categories, CategorySerializer(categories, many=True).data
+    )}
+
+
+def load_reviews(keys):
+    """Отзывы дополняются id произведения, чтобы клиент знал их адрес."""
+    reviews = Review.objects.filter(pk__in=keys).select_related('author')
+    serialized = ReviewSerializer(reviews, many=True).data
+    return {str(review.pk): dict(data, title=review.title_id)
+            for review, data in zip(reviews, serialized)}
+
+
+def load_comments(keys):
+    """Комментарии дополняются id отзыва и произведения."""
+    comments = Comment.objects.filter(pk__in=keys).select_related(
+        'author', 'review'
+    )
+    serialized = CommentSerializer(comments, many=True).data
+    return {str(comment.pk): dict(data, review=comment.review_id,
+                                  title=comment.review.title_id)
+            for comment, data in zip(comments, serialized)}
+
+
+LOADERS = {
+    Change.TITLE: load_titles,
+    Change.GENRE: load_genres,
+    Change.CATEGORY: load_categories,
+    Change.REVIEW: load_reviews,
+    Change.COMMENT: load_comments,
+}
+
+
+def settled_changes(since, limit):
+    """Записи журнала после токена since, не больше limit.
+    Номера записей выдаются до фиксации транзакций, поэтому запись
+    с меньшим номером может стать видна позже записи с большим.
+    Лента обрывается на первой записи моложе CHANGES_SETTLE_DELAY
+    секунд, чтобы токен не перескочил через еще не видимые записи.
+    Возвращает записи и признак того, что за ними есть еще.
+    """
+    settled = timezone.now() - datetime.timedelta(
+        seconds=settings.CHANGES_SETTLE_DELAY
+    )
+    changes = list(Change.objects.filter(id__gt=since)[:limit + 1])
+    for position, change in enumerate(changes):
+        if change.changed > settled:
+            return changes[:position], False
+    return changes[:limit], len(changes) > limit
+
+
+def build_entries(changes):
+    """Записи ленты с текущим состоянием измененных объектов,
+    загруженным одним запросом на каждый тип объектов.
+    Объект, удаленный после чтения журнала, выдается как удаленный:
+    отметка о его удалении придет со следующими токенами.
+    Из нескольких записей одного объекта на странице остается
+    последняя: журнал сжимается не сразу.
+    """
+    latest = {}
+    for change in changes:
+        latest.pop((change.model, change.key), None)
+        latest[change.model, change.key] = change
+    changes = list(latest.values())
+    keys = {}
+    for change in changes:
+        if not change.deleted:
+            keys.setdefault(change.model, []).append(change.key)
+    objects = {model: LOADERS[model](model_keys)
+               for model, model_keys in keys.items()}
+    entries = []
+    for change in changes:
+        data = objects.get(change.model, {}).get(change.key)
+        entries.append({
+            'token': str(change.id),
+            'model': change.model,
+            'key': change.key,
+            'deleted': data is None,
+            'changed': change.changed,
+            'data': data,
+        })
+    return entries
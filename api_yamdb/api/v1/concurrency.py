@@ -0,0 +1,51 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+executor = None
+executor_lock = threading.Lock()
+
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.API_FANOUT_WORKERS,
+                thread_name_prefix='fanout',
+            )
+        return executor
+
+
+def run_task(context, func):
+    """Выполняет задачу в контексте запроса. Соединения потока
+    закрываются по тем же правилам, что и в конце запроса
+    (CONN_MAX_AGE), поэтому постоянные соединения и пул переиспользуются.
+    """
+    close_old_connections()
+    try:
+        return context.run(func)
+    finally:
+        close_old_connections()
+
+
+def fan_out(*funcs):
+    """Выполняет независимые запросы к базе данных одновременно
+    и возвращает их результаты в том же порядке.
+    Первая функция выполняется в текущем потоке, остальные - в пуле
+    из API_FANOUT_WORKERS потоков. Внутри транзакции и при нулевом
+    API_FANOUT_WORKERS функции выполняются по очереди: другие потоки
+    не видят незафиксированных изменений.
+    """
+    if (not settings.API_FANOUT_WORKERS or len(funcs) < 2
+            or connection.in_atomic_block):
+        return [func() for func in funcs]
+    futures = [
+        get_executor().submit(run_task, contextvars.copy_context(), func)
+        for func in funcs[1:]
+    ]
+    first = funcs[0]()
+    return [first] + [future.result() for future in futures]
@@ -0,0 +1,95 @@
+import hashlib
+import time
+from datetime import datetime
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework import permissions
+
+
+def make_etag(version, *variant):
+    """ETag ответа: версия данных и, для списков, параметры варианта."""
+    raw = '|'.join((str(version), *variant))
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def list_variant(request):
+    """Параметры запроса и формат ответа, от которых зависит список."""
+    return (request.META.get('QUERY_STRING', ''),
+            request.accepted_renderer.format)
+
+
+class ConditionalResponseMixin:
+    """Условные запросы по дешевым версиям данных.
+    GET отвечает 304 по If-None-Match/If-Modified-Since без сериализации,
+    а PATCH и DELETE проверяют If-Match/If-Unmodified-Since.
+    Версия - время изменения объекта или любое другое значение,
+    меняющееся вместе с ответом; None означает отсутствие объекта.
+    ETag объекта строится только по его версии, чтобы ETag из ответа
+    с ?expand=, ?fields= или другим форматом подходил для If-Match
+    при изменении того же объекта. ETag списка учитывает параметры
+    запроса и формат ответа.
+    Last-Modified точен до секунды, поэтому для версии текущей секунды
+    GET не выставляет его и не отвечает 304 по If-Modified-Since:
+    изменение в ту же секунду не поменяло бы дату, и клиент остался бы
+    со старым ответом.
+    """
+
+    def get_collection_version(self):
+        return None
+
+    def get_resource_version(self):
+        return None
+
+    def conditional_response(self, get_version, handler, is_list, request,
+                             *args, **kwargs):
+        version = get_version()
+        if version is None:
+            return handler(request, *args, **kwargs)
+        if is_list:
+            etag = make_etag(version, *list_variant(request))
+        else:
+            etag = make_etag(version)
+        last_modified = None
+        if isinstance(version, datetime):
+            last_modified = int(version.timestamp())
+            if (request.method in permissions.SAFE_METHODS
+                    and last_modified >= int(time.time())):
+                last_modified = None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if (request.method in permissions.SAFE_METHODS
+                and response.status_code in (200, 304)):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            if not is_list:
+                patch_vary_headers(response, ('Accept',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_collection_version, super().list, True,
+            request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_resource_version, super().retrieve, False,
+            request, *args, **kwargs
+        )
+
+    def update(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_resource_version, super().update, False,
+            request, *args, **kwargs
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_resource_version, super().destroy, False,
+            request, *args, **kwargs
+        )
@@ -0,0 +1,159 @@
+import csv
+import datetime
+import io
+from collections import defaultdict
+from itertools import islice
+
+import orjson
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from reviews.models import Comment, Review, Title
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class TitleDataset:
+    """Произведения со slug категории и списком slug жанров.
+    Фильтр по датам применяется к времени изменения произведения.
+    """
+    columns = ('id', 'name', 'year', 'description', 'category', 'genre',
+               'rating', 'modified')
+    date_field = 'modified'
+
+    def get_queryset(self):
+        return Title.objects.order_by('pk').values_list(
+            'id', 'name', 'year', 'description', 'category__slug',
+            'score_sum', 'score_count', 'modified'
+        )
+
+    def build_rows(self, rows):
+        """Жанры всех произведений пачки загружаются одним запросом."""
+        genres = defaultdict(list)
+        links = Title.genre.through.objects.filter(
+            title_id__in=[row[0] for row in rows]
+        ).order_by('genre__slug').values_list('title_id', 'genre__slug')
+        for title_id, slug in links:
+            genres[title_id].append(slug)
+        return [
+            (pk, name, year, description, category, genres[pk],
+             score_sum // score_count if score_count else None, modified)
+            for (pk, name, year, description, category, score_sum,
+                 score_count, modified) in rows
+        ]
+
+
+class ReviewDataset:
+    columns = ('id', 'title', 'author', 'text', 'score', 'pub_date')
+    date_field = 'pub_date'
+
+    def get_queryset(self):
+        return Review.objects.order_by('pk').values_list(
+            'id', 'title_id', 'author__username', 'text', 'score', 'pub_date'
+        )
+
+    def build_rows(self, rows):
+        return rows
+
+
+class CommentDataset:
+    columns = ('id', 'title', 'review', 'author', 'text', 'pub_date')
+    date_field = 'pub_date'
+
+    def get_queryset(self):
+        return Comment.objects.order_by('pk').values_list(
+            'id', 'review__title_id', 'review_id', 'author__username', 'text',
+            'pub_date'
+        )
+
+    def build_rows(self, rows):
+        return rows
+
+
+DATASETS = {
+    'titles': TitleDataset,
+    'reviews': ReviewDataset,
+    'comments': CommentDataset,
+}
+
+
+def parse_moment(value):
+    """Дата или дата со временем в формате ISO 8601; время без часового
+    пояса считается временем в UTC.
+    """
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            date = parse_date(value)
+            if date is None:
+                raise ValueError(value)
+            moment = datetime.datetime.combine(date, datetime.time())
+    except ValueError:
+        raise ValueError(f'Неверная дата: {value}')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, datetime.timezone.utc)
+    return moment
+
+
+def export_chunks(dataset, since=None, until=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE):
+    """Строки выгрузки пачками по chunk_size.
+    Запрос читается серверным курсором через iterator(), поэтому
+    в памяти одновременно находится только одна пачка.
+    """
+    queryset = dataset.get_queryset()
+    if since is not None:
+        queryset = queryset.filter(**{f'{dataset.date_field}__gte': since})
+    if until is not None:
+        queryset = queryset.filter(**{f'{dataset.date_field}__lt': until})
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield dataset.build_rows(chunk)
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ','.join(value)
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def render_csv(columns, chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows([csv_value(value) for value in row] for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def render_ndjson(columns, chunks):
+    for chunk in chunks:
+        yield ''.join(
+            orjson.dumps(dict(zip(columns, row))).decode() + '\n'
+            for row in chunk
+        )
+
+
+def export(name, output, since=None, until=None,
+           chunk_size=DEFAULT_CHUNK_SIZE):
+    """Генератор текста выгрузки набора данных name в формате output."""
+    dataset = DATASETS[name]()
+    chunks = export_chunks(dataset, since, until, chunk_size)
+    if output == 'csv':
+        return render_csv(dataset.columns, chunks)
+    return render_ndjson(dataset.columns, chunks)
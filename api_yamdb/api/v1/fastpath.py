@@ -0,0 +1,123 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.http import Http404
+from rest_framework.response import Response
+
+from api.v1.fieldsets import requested_fields
+from reviews.models import Title
+
+
+class ValuesReadMixin:
+    """Быстрое чтение списка и объекта без ModelSerializer.
+    Строки берутся из values() и собираются в словари build_rows,
+    которые должны совпадать с ответом обычного сериалайзера.
+    Встраивание связанных объектов (?expand=) обрабатывает обычный путь.
+    value_columns - столбцы для каждого поля ответа: при ?fields=
+    читаются только столбцы запрошенных полей.
+    """
+    value_columns = {}
+    always_columns = ()
+
+    def use_values_path(self):
+        return (settings.API_FAST_READ_PATH
+                and not self.request.query_params.get('expand'))
+
+    def get_values_queryset(self):
+        return self.filter_queryset(self.queryset.all())
+
+    def build_rows(self, rows):
+        raise NotImplementedError
+
+    def get_values_columns(self):
+        requested = requested_fields(self.request)
+        columns = dict.fromkeys(self.always_columns)
+        for name, fields in self.value_columns.items():
+            if requested is None or name in requested:
+                columns.update(dict.fromkeys(fields))
+        return list(columns)
+
+    def get_rows(self, rows):
+        rows = self.build_rows(list(rows))
+        requested = requested_fields(self.request)
+        if requested is None:
+            return rows
+        return [{name: value for name, value in row.items()
+                 if name in requested} for row in rows]
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_values_path():
+            return super().list(request, *args, **kwargs)
+        queryset = self.get_values_queryset().values(
+            *self.get_values_columns()
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_rows(page))
+        return Response(self.get_rows(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.use_values_path():
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = self.get_values_queryset().filter(**{
+            self.lookup_field: self.kwargs[lookup_url_kwarg]
+        }).values(*self.get_values_columns()).first()
+        if row is None:
+            raise Http404
+        return Response(self.get_rows([row])[0])
+
+
+class SlugNameValuesReadMixin(ValuesReadMixin):
+    """Быстрое чтение жанров и категорий в формате их сериалайзеров."""
+    value_columns = {'name': ('name',), 'slug': ('slug',)}
+
+    def build_rows(self, rows):
+        return [{'name': row.get('name'), 'slug': row.get('slug')}
+                for row in rows]
+
+
+class TitleValuesReadMixin(ValuesReadMixin):
+    """Быстрое чтение произведений в формате TitleListSerializer.
+    Жанры всех произведений страницы загружаются одним запросом.
+    """
+    value_columns = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'description': ('description',),
+        'rating': ('score_sum', 'score_count'),
+        'genre': (),
+        'category': ('category_id', 'category__name', 'category__slug'),
+    }
+    always_columns = ('id',)
+
+    def get_genres(self, title_ids):
+        requested = requested_fields(self.request)
+        genres = defaultdict(list)
+        if requested is not None and 'genre' not in requested:
+            return genres
+        links = Title.genre.through.objects.filter(
+            title_id__in=title_ids
+        ).order_by('genre__name').values_list(
+            'title_id', 'genre__name', 'genre__slug'
+        )
+        for title_id, name, slug in links:
+            genres[title_id].append({'name': name, 'slug': slug})
+        return genres
+
+    def build_rows(self, rows):
+        genres = self.get_genres([row['id'] for row in rows])
+        return [{
+            'id': row['id'],
+            'name': row.get('name'),
+            'year': row.get('year'),
+            'description': row.get('description'),
+            'rating': (row['score_sum'] // row['score_count']
+                       if row.get('score_count') else None),
+            'genre': genres[row['id']],
+            'category': None if row.get('category_id') is None else {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            },
+        } for row in rows]
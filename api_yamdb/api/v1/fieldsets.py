@@ -0,0 +1,74 @@
+from rest_framework import permissions
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+
+
+def parse_list_param(request, name):
+    """Множество значений параметра запроса, перечисленных через запятую,
+    или None, если параметр не передан.
+    """
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+def requested_fields(request):
+    return parse_list_param(request, FIELDS_QUERY_PARAM)
+
+
+def requested_expansions(request):
+    return parse_list_param(request, EXPAND_QUERY_PARAM) or set()
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляет в ответе только поля из параметра ?fields=.
+    Применяется только к сериалайзеру верхнего уровня, вложенные
+    объекты выводятся целиком.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = requested_fields(self.context.get('request'))
+        if requested is None or self.root not in (self, self.parent):
+            return fields
+        for name in list(fields):
+            if name not in requested:
+                fields.pop(name)
+        return fields
+
+
+class SparseFieldsViewMixin:
+    """Урезает запрос к базе данных под поля из параметра ?fields=:
+    читает только нужные столбцы через only() и пропускает
+    select_related и prefetch_related для невыводимых полей.
+    field_columns - столбцы модели для каждого поля ответа,
+    field_select_related и field_prefetch_related - связи, нужные полю.
+    Столбцы из always_columns читаются всегда, например ключи пагинации.
+    """
+    field_columns = {}
+    field_select_related = {}
+    field_prefetch_related = {}
+    always_columns = ('id',)
+
+    def trim_queryset(self, queryset):
+        requested = requested_fields(self.request)
+        names = self.field_columns.keys()
+        if requested is not None:
+            names = [name for name in names if name in requested]
+        select = [self.field_select_related[name] for name in names
+                  if name in self.field_select_related]
+        prefetch = [self.field_prefetch_related[name] for name in names
+                    if name in self.field_prefetch_related]
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if requested is not None:
+            columns = [column for name in names
+                       for column in self.field_columns[name]]
+            queryset = queryset.only(*self.always_columns, *columns)
+        return queryset
@@ -1,18 +1,95 @@
 import django_filters
+from rest_framework import filters
 
-from reviews.models import Title
+from reviews.models import Genre, Title
+from reviews.search import search_reviews, trigram_available, trigram_search
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Фильтр по нескольким значениям, перечисленным через запятую."""
 
 
 class TitleFilter(django_filters.FilterSet):
-    """Фильтр для модели Title."""
+    """Фильтр для модели Title.
+    Жанры проверяются подзапросом к таблице связи с жанрами, а не
+    соединением с ней, поэтому произведения в ответе не повторяются.
+    """
+    GENRE_ANY = 'any'
+    GENRE_ALL = 'all'
+
     name = django_filters.CharFilter(
         field_name='name',
         lookup_expr='icontains',
     )
     year = django_filters.NumberFilter(field_name='year')
-    genre = django_filters.CharFilter(field_name='genre__slug')
-    category = django_filters.CharFilter(field_name='category__slug')
+    year_min = django_filters.NumberFilter(field_name='year',
+                                           lookup_expr='gte')
+    year_max = django_filters.NumberFilter(field_name='year',
+                                           lookup_expr='lte')
+    genre = CharInFilter(method='filter_genre')
+    genre_mode = django_filters.ChoiceFilter(
+        choices=((GENRE_ANY, 'Любой из жанров'),
+                 (GENRE_ALL, 'Все жанры')),
+        method='filter_genre_mode',
+    )
+    category = CharInFilter(field_name='category__slug')
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'genre', 'category')
+        fields = ('name', 'year', 'year_min', 'year_max', 'genre',
+                  'genre_mode', 'category')
+
+    def filter_genre(self, queryset, name, value):
+        """Произведения с любым из жанров value или, при genre_mode=all,
+        со всеми сразу. Slug сначала переводятся в id жанров отдельным
+        запросом: условие по известным id планировщик оценивает точнее
+        и читает связи по индексу (genre_id, title_id). Режим all
+        проверяется отдельным подзапросом на каждый жанр.
+        """
+        slugs = set(filter(None, value))
+        if not slugs:
+            return queryset
+        genre_ids = list(Genre.objects.filter(
+            slug__in=slugs
+        ).values_list('pk', flat=True))
+        links = Title.genre.through.objects.values('title_id')
+        if self.form.cleaned_data.get('genre_mode') != self.GENRE_ALL:
+            return queryset.filter(
+                pk__in=links.filter(genre_id__in=genre_ids)
+            )
+        if len(genre_ids) < len(slugs):
+            return queryset.none()
+        for genre_id in genre_ids:
+            queryset = queryset.filter(pk__in=links.filter(genre_id=genre_id))
+        return queryset
+
+    def filter_genre_mode(self, queryset, name, value):
+        """Режим учитывается в filter_genre."""
+        return queryset
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """Поиск по первому полю из search_fields с учетом опечаток
+    и ранжированием (PostgreSQL с pg_trgm). В остальных базах данных
+    работает как обычный SearchFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        search_fields = self.get_search_fields(view, request)
+        if not query or not search_fields:
+            return queryset
+        if not trigram_available(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+        return trigram_search(queryset, search_fields[0], query)
+
+
+class ReviewSearchFilter(filters.BaseFilterBackend):
+    """Полнотекстовый поиск по тексту отзывов (параметр q)."""
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_reviews(queryset, query)
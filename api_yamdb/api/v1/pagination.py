@@ -0,0 +1,126 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class PubDateCursorPagination(BasePagination):
+    """Курсорная (keyset) пагинация по паре (pub_date, id).
+    Страница выбирается условием по ключу сортировки, поэтому не нужны
+    ни COUNT(*), ни OFFSET, а курсоры не сдвигаются при добавлении
+    новых объектов.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+        if cursor is None:
+            reverse = False
+        else:
+            reverse, pub_date, pk = cursor
+            queryset = self.filter_after(queryset, reverse, pub_date, pk)
+        ordering = ('pub_date', 'id') if reverse else ('-pub_date', '-id')
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def filter_after(self, queryset, reverse, pub_date, pk):
+        """Оставляет объекты, идущие после курсора в выбранном направлении.
+        Условие по одному pub_date позволяет использовать составной индекс.
+        """
+        if reverse:
+            return queryset.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk),
+                pub_date__gte=pub_date,
+            )
+        return queryset.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk),
+            pub_date__lte=pub_date,
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            reverse, pub_date, pk = (
+                b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            )
+            pub_date = parse_datetime(pub_date)
+            if pub_date is None:
+                raise ValueError
+            return reverse == '1', pub_date, int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, reverse, obj):
+        raw = f'{int(reverse)}|{obj.pub_date.isoformat()}|{obj.pk}'
+        encoded = b64encode(raw.encode('ascii')).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(True, self.page[0])
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class OptionalCursorPagination(BasePagination):
+    """Постраничная пагинация по умолчанию; курсорная включается
+    параметром ?pagination=cursor или переданным курсором.
+    """
+    pagination_query_param = 'pagination'
+
+    def __init__(self):
+        self.cursor_paginator = PubDateCursorPagination()
+        self.paginator = PageNumberPagination()
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.pagination_query_param) == 'cursor'
+            or self.cursor_paginator.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.paginator = self.cursor_paginator
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    @property
+    def display_page_controls(self):
+        return self.paginator.display_page_controls
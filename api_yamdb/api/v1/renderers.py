@@ -0,0 +1,28 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON-рендерер на orjson. Выводит тот же компактный UTF-8 JSON,
+    что и стандартный JSONRenderer с настройками по умолчанию, включая
+    экранирование U+2028 и U+2029; типы, которых нет в orjson, кодируются
+    JSONEncoder из DRF. Ответ с отступами (indent в Accept или в контексте
+    рендерера) строит JSONRenderer: orjson умеет только отступ в 2 пробела.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        return orjson.dumps(
+            data,
+            default=JSONEncoder().default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        ).replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace(
+            '\u2029'.encode(), b'\\u2029'
+        )
@@ -2,8 +2,11 @@ from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueValidator
 
+from api.v1.fieldsets import SparseFieldsSerializerMixin
 from api.v1.validators import validate_username_not_me
-from reviews.models import Category, Comment, Genre, Review, Title
+from rankings.models import Ranking, RankingEntry
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleScoreStats)
 from users.models import CustomUser
 
 err_username_message = 'Пользователь с таким именем уже есть'
@@ -54,11 +57,49 @@ class TitleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
 
 
-class TitleListSerializer(serializers.ModelSerializer):
-    """Сериалайзер для получения списка объектов модели Title."""
+class TitleBulkItemSerializer(serializers.ModelSerializer):
+    """Сериалайзер одного произведения при пакетной записи.
+    Жанры, категории и изменяемые произведения ищутся в словарях,
+    заранее загруженных для всего пакета, а не отдельными запросами.
+    """
+    id = serializers.IntegerField(required=False)
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
+
+    def validate_id(self, value):
+        if value not in self.context['titles']:
+            raise serializers.ValidationError('Произведение не найдено')
+        return value
+
+    def validate_genre(self, value):
+        genres = self.context['genres']
+        missing = [slug for slug in value if slug not in genres]
+        if missing:
+            raise serializers.ValidationError(
+                f'Жанры не найдены: {", ".join(missing)}')
+        return [genres[slug] for slug in dict.fromkeys(value)]
+
+    def validate_category(self, value):
+        if value not in self.context['categories']:
+            raise serializers.ValidationError(
+                f'Категория не найдена: {value}')
+        return self.context['categories'][value]
+
+
+class TitleListSerializer(SparseFieldsSerializerMixin,
+                          serializers.ModelSerializer):
+    """Сериалайзер для получения списка объектов модели Title.
+    При ?expand=reviews в ответ произведения встраиваются последние
+    отзывы, а при ?expand=stats - статистика оценок, заранее
+    загруженные во вьюсете в атрибуты latest_reviews и expanded_stats.
+    """
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
     rating = serializers.IntegerField(read_only=True, allow_null=True)
@@ -68,8 +109,56 @@ class TitleListSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'year', 'description', 'rating', 'genre',
                   'category')
 
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = self.context.get('expand', ())
+        if 'reviews' in expand:
+            fields['reviews'] = ReviewSerializer(
+                source='latest_reviews', many=True, read_only=True
+            )
+        if 'stats' in expand:
+            fields['stats'] = TitleScoreStatsSerializer(
+                source='expanded_stats', read_only=True
+            )
+        return fields
+
+
+class TitleScoreStatsSerializer(serializers.ModelSerializer):
+    """Сериалайзер для статистики оценок произведения."""
+    count = serializers.IntegerField(read_only=True)
+    average = serializers.FloatField(read_only=True, allow_null=True)
+    median = serializers.FloatField(read_only=True, allow_null=True)
+    histogram = serializers.DictField(child=serializers.IntegerField(),
+                                      read_only=True)
+
+    class Meta:
+        model = TitleScoreStats
+        fields = ('count', 'average', 'median', 'histogram')
 
-class ReviewSerializer(serializers.ModelSerializer):
+
+class RankingEntrySerializer(serializers.ModelSerializer):
+    """Сериалайзер для места произведения в рейтинге."""
+    title = serializers.PrimaryKeyRelatedField(read_only=True)
+    name = serializers.CharField(source='title.name', read_only=True)
+    year = serializers.IntegerField(source='title.year', read_only=True)
+
+    class Meta:
+        model = RankingEntry
+        fields = ('position', 'title', 'name', 'year', 'score',
+                  'score_count')
+
+
+class RankingSerializer(serializers.ModelSerializer):
+    """Сериалайзер для рейтинга лучших произведений."""
+    entries = RankingEntrySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Ranking
+        fields = ('kind', 'key', 'refreshed_at', 'entries')
+
+
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(read_only=True,
                                           slug_field='username')
     """Сериализатор для отзывов."""
@@ -94,7 +183,19 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class ReviewSearchSerializer(ReviewSerializer):
+    """Сериализатор для результатов поиска по отзывам."""
+    title = serializers.PrimaryKeyRelatedField(read_only=True)
+    rank = serializers.FloatField(source='search_rank', read_only=True)
+    headline = serializers.CharField(source='search_headline',
+                                     read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title', 'rank', 'headline')
+
+
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(read_only=True,
                                           slug_field='username')
     """Сериализатор для комментариев."""
@@ -0,0 +1,135 @@
+import hashlib
+import time
+from collections.abc import Mapping
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import permissions
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+BUCKET_KEY = 'throttle:{}:{}'
+MIN_KEY_TIMEOUT = 60
+
+
+def take_token(key, capacity, duration, now):
+    """Берет токен из корзины объемом capacity, которая полностью
+    наполняется за duration секунд. Возвращает None, если токен взят,
+    или сколько секунд ждать следующего.
+    В кеше хранятся момент отсчета и число выданных токенов; выдача
+    считается атомарным incr, поэтому лимит соблюдается для всех
+    воркеров и серверов с общим кешем. Накопленный запас не превышает
+    объема корзины: при переполнении момент отсчета сдвигается.
+    """
+    rate = capacity / duration
+    start_key = BUCKET_KEY.format(key, 'start')
+    count_key = BUCKET_KEY.format(key, 'count')
+    timeout = max(int(duration * 10), MIN_KEY_TIMEOUT)
+    start = cache.get(start_key)
+    if start is None:
+        cache.add(start_key, now, timeout)
+        start = cache.get(start_key, now)
+    try:
+        granted = cache.incr(count_key)
+    except ValueError:
+        cache.add(count_key, 0, timeout)
+        granted = cache.incr(count_key)
+    debt = granted - (now - start) * rate
+    if debt > capacity:
+        try:
+            cache.decr(count_key)
+        except ValueError:
+            # Счетчик истек между incr и decr: возвращать токен некуда.
+            pass
+        return (debt - capacity) / rate
+    if debt < 1:
+        cache.set(start_key, now - (granted - 1) / rate, timeout)
+    return None
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Ограничение частоты запросов по алгоритму корзины токенов.
+    Скорость задается в DEFAULT_THROTTLE_RATES в формате DRF
+    (например, 10/min): это и объем корзины, и скорость ее наполнения.
+    Ограничение без заданной скорости не действует.
+    """
+
+    def get_rate(self):
+        """Скорость читается из текущих настроек, а не из копии,
+        сохраненной при импорте DRF.
+        """
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        if self.scope not in rates:
+            raise ImproperlyConfigured(
+                f'Не задана скорость для ограничения {self.scope}'
+            )
+        return rates[self.scope]
+
+    def get_ident_key(self, request, view):
+        """Идентификатор клиента или None, если запрос не ограничивается."""
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return None
+        digest = hashlib.md5(str(ident).encode()).hexdigest()
+        return f'{self.scope}:{digest}'
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        self.wait_seconds = take_token(key, self.num_requests, self.duration,
+                                       time.time())
+        return self.wait_seconds is None
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Регистрация и получение токена с одного IP-адреса."""
+    scope = 'auth_ip'
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    """Регистрация и подбор кода подтверждения для одного имени
+    пользователя с любых адресов.
+    """
+    scope = 'auth_user'
+
+    def get_ident_key(self, request, view):
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return username.lower()
+
+
+class ContentWriteThrottle(TokenBucketThrottle):
+    """Создание отзывов и комментариев одним пользователем."""
+    scope = 'content_write'
+
+    def get_ident_key(self, request, view):
+        if request.method != 'POST' or not request.user.is_authenticated:
+            return None
+        return request.user.pk
+
+
+class AdminWriteThrottle(TokenBucketThrottle):
+    """Изменяющие запросы одного пользователя к каталогу и пользователям."""
+    scope = 'admin_write'
+
+    def get_ident_key(self, request, view):
+        if (request.method in permissions.SAFE_METHODS
+                or not request.user.is_authenticated):
+            return None
+        return request.user.pk
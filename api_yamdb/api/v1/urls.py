@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework import routers
 
-from api.v1.views import (CategoryViewSet, CommentViewSet, CustomUserViewSet,
-                          GenreViewSet, ReviewViewSet, TitleViewSet,
-                          get_auth_token, signup)
+from api.v1.views import (CategoryViewSet, ChangeFeedView, CommentViewSet,
+                          CustomUserViewSet, ExportView, GenreViewSet,
+                          RankingViewSet, ReviewSearchViewSet, ReviewViewSet,
+                          TitleViewSet, get_auth_token, signup)
 
 v1_router = routers.DefaultRouter()
 v1_router.register(r'titles/(?P<title_id>\d+)/reviews',
@@ -15,6 +16,10 @@ v1_router.register('users', CustomUserViewSet)
 v1_router.register('categories', CategoryViewSet, basename='categories')
 v1_router.register('genres', GenreViewSet, basename='genres')
 v1_router.register('titles', TitleViewSet, basename='titles')
+v1_router.register(r'rankings/(?P<kind>genre|category|year)',
+                   RankingViewSet, basename='ranking')
+v1_router.register('reviews/search', ReviewSearchViewSet,
+                   basename='review-search')
 
 auth_urls = [
     path('signup/', signup, name='signup'),
@@ -23,5 +28,7 @@ auth_urls = [
 
 urlpatterns = [
     path('', include(v1_router.urls)),
+    path('changes/', ChangeFeedView.as_view(), name='changes'),
+    path('export/<str:dataset>/', ExportView.as_view(), name='export'),
     path('auth/', include(auth_urls))
 ]
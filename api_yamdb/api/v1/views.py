@@ -1,26 +1,55 @@
+from functools import partial
+
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db.models import Prefetch
+from django.db.models.functions import Upper
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.views import APIView
 
-from api.v1.filters import TitleFilter
+from api.v1.authentication import get_token_for_user
+from api.v1.bulk import BULK_MAX_ITEMS, BULK_MODES, TitleBulkWriter
+from api.v1.cache import CachedListMixin, CachedRetrieveMixin
+from api.v1.changefeed import build_entries, parse_token, settled_changes
+from api.v1.concurrency import fan_out
+from api.v1.conditional import ConditionalResponseMixin
+from api.v1.export import (CONTENT_TYPES, DATASETS, EXPORT_FORMATS, export,
+                           parse_moment)
+from api.v1.fastpath import SlugNameValuesReadMixin, TitleValuesReadMixin
+from api.v1.fieldsets import SparseFieldsViewMixin, requested_expansions
+from api.v1.filters import (ReviewSearchFilter, TitleFilter,
+                            TrigramSearchFilter)
+from api.v1.pagination import OptionalCursorPagination
 from api.v1.permissions import (IsAdmin, IsAdminOrReadOnly,
                                 IsAuthorAdminModeratorOrReadOnly)
 from api.v1.serializers import (CategorySerializer, CommentSerializer,
                                 CustomUserSerializer, GenreSerializer,
-                                JWTTokenSerializer, ReviewSerializer,
-                                SignupSerializer, TitleListSerializer,
+                                JWTTokenSerializer, RankingSerializer,
+                                ReviewSearchSerializer,
+                                ReviewSerializer, SignupSerializer,
+                                TitleListSerializer, TitleScoreStatsSerializer,
                                 TitleSerializer)
-from reviews.models import Category, Genre, Review, Title
+from api.v1.throttling import (AdminWriteThrottle, AuthIPThrottle,
+                               AuthUsernameThrottle, ContentWriteThrottle)
+from outbox.mail import enqueue_mail
+from rankings.models import Ranking, RankingEntry
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleScoreStats)
+from reviews.versions import get_versions
 from users.models import CustomUser
 
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+EXPAND_REVIEWS_LIMIT = 10
+
 
 class CreateListDestroyViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
                                mixins.DestroyModelMixin,
@@ -34,74 +63,393 @@ class GetPostPatchDeleteViewSet(viewsets.ModelViewSet):
     http_method_names = ('get', 'post', 'patch', 'delete')
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(CachedListMixin, SlugNameValuesReadMixin,
+                      CreateListDestroyViewSet):
     """Вьюсет для выполнения операций с объектами модели Category."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (filters.SearchFilter,)
+    throttle_classes = (AdminWriteThrottle,)
+    filter_backends = (TrigramSearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_dependencies = ('category',)
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(CachedListMixin, SlugNameValuesReadMixin,
+                   CreateListDestroyViewSet):
     """Вьюсет для выполнения операций с объектами модели Genre."""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (filters.SearchFilter,)
+    throttle_classes = (AdminWriteThrottle,)
+    filter_backends = (TrigramSearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_dependencies = ('genre',)
+
+
+def get_latest_reviews(title_id):
+    return list(Review.objects.filter(title_id=title_id).select_related(
+        'author'
+    ).order_by('-pub_date', '-id')[:EXPAND_REVIEWS_LIMIT])
 
 
-class TitleViewSet(GetPostPatchDeleteViewSet):
+def get_score_stats(title_id):
+    return (TitleScoreStats.objects.filter(pk=title_id).first()
+            or TitleScoreStats(title_id=title_id))
+
+
+class TitleViewSet(SparseFieldsViewMixin, ConditionalResponseMixin,
+                   CachedListMixin, CachedRetrieveMixin, TitleValuesReadMixin,
+                   GetPostPatchDeleteViewSet):
     """Вьюсет для выполнения операций с объектами модели Title."""
-    queryset = Title.objects.all().annotate(
-        rating=Avg('reviews__score')
-    ).order_by('-year')
+    queryset = Title.objects.all().order_by('-year')
     permission_classes = (IsAdminOrReadOnly, )
-    filter_backends = (DjangoFilterBackend, )
+    throttle_classes = (AdminWriteThrottle,)
+    filter_backends = (DjangoFilterBackend, TrigramSearchFilter)
     filterset_class = TitleFilter
+    search_fields = ('name',)
+    cache_dependencies = ('title', 'genre', 'category', 'review')
+    field_columns = {
+        'id': (),
+        'name': ('name',),
+        'year': ('year',),
+        'description': ('description',),
+        'rating': ('score_sum', 'score_count'),
+        'genre': (),
+        'category': ('category',),
+    }
+    field_select_related = {'category': 'category'}
+    field_prefetch_related = {'genre': 'genre'}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+        return self.trim_queryset(queryset)
+
+    def get_object(self):
+        """Произведение и встраиваемые в ответ отзывы и статистика
+        оценок загружаются одновременно независимыми запросами.
+        """
+        expansions = self.get_expansions()
+        pk = self.kwargs.get('pk')
+        tasks = {'title': super().get_object}
+        if 'reviews' in expansions:
+            tasks['reviews'] = partial(get_latest_reviews, pk)
+        if 'stats' in expansions:
+            tasks['stats'] = partial(get_score_stats, pk)
+        if len(tasks) == 1:
+            return super().get_object()
+        results = dict(zip(tasks, fan_out(*tasks.values())))
+        title = results['title']
+        title.latest_reviews = results.get('reviews', [])
+        title.expanded_stats = results.get('stats')
+        return title
+
+    def get_expansions(self):
+        """Встраивание связанных объектов доступно только для
+        одного произведения.
+        """
+        if self.action != 'retrieve':
+            return set()
+        return requested_expansions(self.request)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expansions()
+        return context
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleListSerializer
         return TitleSerializer
 
+    def get_collection_version(self):
+        return get_versions(*self.cache_dependencies)
+
+    @action(detail=False, url_path='autocomplete')
+    def autocomplete(self, request):
+        """Первые по алфавиту произведения, название которых начинается
+        с параметра q.
+        """
+        prefix = request.query_params.get('q', '').strip()
+        try:
+            limit = int(request.query_params.get('limit',
+                                                 AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            limit = AUTOCOMPLETE_LIMIT
+        limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+        if not prefix:
+            return Response([])
+        titles = Title.objects.filter(
+            name__istartswith=prefix
+        ).order_by(Upper('name')).values('id', 'name')[:limit]
+        return Response(list(titles))
 
-class ReviewViewSet(GetPostPatchDeleteViewSet):
+    @action(detail=True, url_path='stats')
+    def stats(self, request, pk=None):
+        """Количество, средняя, медиана и распределение оценок."""
+        stats = TitleScoreStats.objects.filter(pk=pk).first()
+        if stats is None:
+            stats = TitleScoreStats(title=get_object_or_404(Title, pk=pk))
+        return Response(TitleScoreStatsSerializer(stats).data)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """Пакетное создание и изменение произведений.
+        Режим выбирается параметром mode: atomic (по умолчанию) или
+        best_effort.
+        """
+        mode = request.query_params.get('mode', 'atomic')
+        if mode not in BULK_MODES:
+            return Response(
+                {'mode': [f'Допустимые значения: {", ".join(BULK_MODES)}']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'Ожидается непустой список'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > BULK_MAX_ITEMS:
+            return Response(
+                {'detail': f'Не более {BULK_MAX_ITEMS} элементов за запрос'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        writer = TitleBulkWriter(items, mode)
+        saved = writer.run()
+        errors = sum(result['status'] == 'error' for result in writer.results)
+        if not saved:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_200_OK
+        return Response({
+            'created': len(writer.created),
+            'updated': len(writer.updated),
+            'errors': errors,
+            'results': writer.results,
+        }, status=response_status)
+
+    def get_resource_version(self):
+        return Title.objects.filter(
+            pk=self.kwargs.get('pk')
+        ).values_list('modified', flat=True).first()
+
+
+class RankingViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Вьюсет для чтения заранее рассчитанных рейтингов."""
+    serializer_class = RankingSerializer
+    permission_classes = (AllowAny,)
+    lookup_field = 'key'
+    lookup_value_regex = '[^/]+'
+
+    def get_queryset(self):
+        return Ranking.objects.filter(
+            kind=self.kwargs.get('kind')
+        ).prefetch_related(Prefetch(
+            'entries',
+            queryset=RankingEntry.objects.select_related('title'),
+        ))
+
+
+class ReviewViewSet(SparseFieldsViewMixin, ConditionalResponseMixin,
+                    GetPostPatchDeleteViewSet):
     """Вьюсет для выполнения операций с объектами модели Review."""
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorAdminModeratorOrReadOnly,)
+    throttle_classes = (ContentWriteThrottle,)
+    pagination_class = OptionalCursorPagination
+    filter_backends = (ReviewSearchFilter,)
+    field_columns = {
+        'id': (),
+        'text': ('text',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'pub_date': (),
+        'title': ('title',),
+    }
+    field_select_related = {'author': 'author'}
+    always_columns = ('id', 'pub_date')
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        return title.reviews.all()
+        """Отзывы произведения одним запросом вместе с авторами.
+        Существование произведения при чтении списка проверяет запрос
+        версии, а при создании - get_title.
+        """
+        return self.trim_queryset(Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ))
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.request.query_params.get('q'):
+            return ReviewSearchSerializer
+        return ReviewSerializer
+
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        serializer.save(author=self.request.user,
-                        title=get_object_or_404(Title, pk=title_id))
+        serializer.save(author=self.request.user, title=self.get_title())
+
+    def get_collection_version(self):
+        """Любое изменение отзывов обновляет время изменения произведения.
+        Пустой результат означает, что произведения нет.
+        """
+        version = Title.objects.filter(
+            pk=self.kwargs.get('title_id')
+        ).values_list('modified', flat=True).first()
+        if version is None:
+            raise Http404
+        return version
+
+    def get_resource_version(self):
+        return Review.objects.filter(
+            pk=self.kwargs.get('pk'), title=self.kwargs.get('title_id')
+        ).values_list('modified', flat=True).first()
 
 
-class CommentViewSet(GetPostPatchDeleteViewSet):
+class ReviewSearchViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Вьюсет для полнотекстового поиска по всем отзывам."""
+    serializer_class = ReviewSearchSerializer
+    permission_classes = (AllowAny,)
+    filter_backends = (ReviewSearchFilter,)
+
+    def get_queryset(self):
+        if not self.request.query_params.get('q', '').strip():
+            return Review.objects.none()
+        return Review.objects.select_related('author')
+
+
+class CommentViewSet(SparseFieldsViewMixin, ConditionalResponseMixin,
+                     GetPostPatchDeleteViewSet):
     """Вьюсет для выполнения операций с объектами модели Comment."""
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorAdminModeratorOrReadOnly,)
+    throttle_classes = (ContentWriteThrottle,)
+    pagination_class = OptionalCursorPagination
+    field_columns = {
+        'id': (),
+        'text': ('text',),
+        'author': ('author__username',),
+        'pub_date': (),
+    }
+    field_select_related = {'author': 'author'}
+    always_columns = ('id', 'pub_date')
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, title=title_id, pk=review_id)
-        return review.comments.all()
+        """Комментарии отзыва одним запросом вместе с авторами;
+        принадлежность отзыва произведению проверяется в том же запросе.
+        """
+        return self.trim_queryset(Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        ))
+
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review, pk=self.kwargs.get('review_id'),
+                title=self.kwargs.get('title_id'),
+            )
+        return self._review
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        serializer.save(author=self.request.user,
-                        review=get_object_or_404(Review, pk=review_id,
-                                                 title=title_id))
+        serializer.save(author=self.request.user, review=self.get_review())
+
+    def get_collection_version(self):
+        """Любое изменение комментариев обновляет время изменения отзыва.
+        Пустой результат означает, что отзыва нет.
+        """
+        version = Review.objects.filter(
+            pk=self.kwargs.get('review_id'), title=self.kwargs.get('title_id')
+        ).values_list('modified', flat=True).first()
+        if version is None:
+            raise Http404
+        return version
+
+    def get_resource_version(self):
+        return Comment.objects.filter(
+            pk=self.kwargs.get('pk'),
+            review=self.kwargs.get('review_id'),
+            review__title=self.kwargs.get('title_id'),
+        ).values_list('modified', flat=True).first()
+
+
+class ChangeFeedView(APIView):
+    """Лента изменений каталога, отзывов и комментариев для
+    инкрементальной синхронизации: возвращает объекты, измененные
+    после токена since, и токен для следующего запроса.
+    """
+    permission_classes = (AllowAny,)
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get(
+                'limit', settings.CHANGES_PAGE_SIZE
+            ))
+        except ValueError:
+            raise ValidationError({'limit': ['Ожидается целое число']})
+        return max(1, min(limit, settings.CHANGES_MAX_PAGE_SIZE))
+
+    def get(self, request):
+        try:
+            since = parse_token(request.query_params.get('since'))
+        except ValueError as error:
+            raise ValidationError({'since': [str(error)]})
+        changes, has_more = settled_changes(since, self.get_limit())
+        token = str(changes[-1].id) if changes else str(since)
+        next_url = None
+        if has_more:
+            next_url = request.build_absolute_uri(
+                f'{request.path}?since={token}'
+            )
+        return Response({
+            'token': token,
+            'next': next_url,
+            'results': build_entries(changes),
+        })
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка произведений, отзывов или комментариев
+    в формате NDJSON или CSV.
+    """
+    permission_classes = (IsAdmin,)
+
+    def get_moment(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return parse_moment(value)
+        except ValueError as error:
+            raise ValidationError({name: [str(error)]})
+
+    def get(self, request, dataset):
+        if dataset not in DATASETS:
+            raise Http404
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': [
+                f'Допустимые значения: {", ".join(EXPORT_FORMATS)}'
+            ]})
+        since = self.get_moment('since')
+        until = self.get_moment('until')
+        response = StreamingHttpResponse(
+            export(dataset, output, since, until),
+            content_type=CONTENT_TYPES[output],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{dataset}.{output}"'
+        )
+        return response
 
 
 class CustomUserViewSet(viewsets.ModelViewSet):
@@ -110,6 +458,7 @@ class CustomUserViewSet(viewsets.ModelViewSet):
     serializer_class = CustomUserSerializer
     lookup_field = 'username'
     permission_classes = (IsAdmin,)
+    throttle_classes = (AdminWriteThrottle,)
 
     @action(
         methods=['get', 'patch'],
@@ -118,8 +467,11 @@ class CustomUserViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated],
     )
     def users_own_profile(self, request):
-        """Метод для работы пользователя с профилем."""
-        current_user = request.user
+        """Метод для работы пользователя с профилем.
+        Пользователь из токена содержит не все поля, поэтому профиль
+        читается из базы данных.
+        """
+        current_user = get_object_or_404(CustomUser, pk=request.user.pk)
         if request.method == 'GET':
             serializer = self.get_serializer(current_user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -135,9 +487,11 @@ class CustomUserViewSet(viewsets.ModelViewSet):
 
 
 def send_confirmation_code(user):
-    """Функция отправки кода подтверждения."""
+    """Функция отправки кода подтверждения.
+    Письмо ставится в очередь и отправляется командой sendemails.
+    """
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(
+    enqueue_mail(
         subject='Код подтверждения',
         message=f'Ваш код подтверждения, {confirmation_code}',
         from_email=settings.DEFAULT_FROM_EMAIL,
@@ -147,6 +501,7 @@ def send_confirmation_code(user):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def signup(request):
     """view-функция получения пользователем токена для API."""
     serializer = SignupSerializer(data=request.data)
@@ -162,6 +517,7 @@ def signup(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def get_auth_token(request):
     """Функция генерации и отправки токена."""
     serializer = JWTTokenSerializer(data=request.data)
@@ -176,5 +532,5 @@ def get_auth_token(request):
     ):
         err = f'Пароль не совпадает с отправленным на email {confirm_code}'
         return Response(err, status=status.HTTP_400_BAD_REQUEST)
-    token = AccessToken.for_user(user)
+    token = get_token_for_user(user)
     return Response({'token': str(token)}, status=status.HTTP_200_OK)
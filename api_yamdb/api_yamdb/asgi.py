@@ -0,0 +1,45 @@
+import os
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+
+class ClosingWsgiToAsgiInstance(WsgiToAsgiInstance):
+    """Обработка запроса WSGI-приложением, которая, в отличие от asgiref,
+    закрывает ответ после отправки тела. Только close() посылает сигнал
+    request_finished: без него соединения с базой в потоках исполнителя
+    и серверные курсоры выгрузки не освобождаются.
+    """
+
+    @sync_to_async
+    def run_wsgi_app(self, body):
+        environ = self.build_environ(self.scope, body)
+        response = self.wsgi_application(environ, self.start_response)
+        try:
+            for output in response:
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                self.sync_send({'type': 'http.response.body',
+                                'body': output, 'more_body': True})
+            if not self.response_started:
+                self.response_started = True
+                self.sync_send(self.response_start)
+            self.sync_send({'type': 'http.response.body'})
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+
+
+class ClosingWsgiToAsgi(WsgiToAsgi):
+
+    async def __call__(self, scope, receive, send):
+        await ClosingWsgiToAsgiInstance(self.wsgi_application)(
+            scope, receive, send
+        )
+
+
+application = ClosingWsgiToAsgi(get_wsgi_application())
@@ -22,11 +22,18 @@ INSTALLED_APPS = [
     'users',
     'api',
     'filldb',
+    'outbox',
+    'rankings',
+    'changes',
+    'benchmarks',
     'rest_framework',
     'django_filters',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
+    'api.middleware.RequestTimingMiddleware',
+    'api.routing.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,10 +72,49 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default=5432)
+        'PORT': os.getenv('DB_PORT', default=5432),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=0)),
+        # Используется бэкендом api.backends.postgresql_pool
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=10)),
+            'IDLE_TIMEOUT': float(os.getenv('DB_POOL_IDLE_TIMEOUT', default=300)),
+            'CHECK_INTERVAL': float(os.getenv('DB_POOL_CHECK_INTERVAL', default=30)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=10)),
+        },
     }
 }
 
+# Реплики для чтения: DB_REPLICA_HOSTS=host1,host2:5433
+DB_REPLICAS = []
+for number, address in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(',')), 1
+):
+    host, _, port = address.strip().partition(':')
+    alias = f'replica{number}'
+    DATABASES[alias] = dict(
+        DATABASES['default'],
+        HOST=host,
+        PORT=port or DATABASES['default']['PORT'],
+        TEST={'MIRROR': 'default'},
+    )
+    DB_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.routing.ReplicaRouter']
+DB_REPLICA_STICKY_SECONDS = float(os.getenv('DB_REPLICA_STICKY_SECONDS', default=5))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=300))
+
+API_FAST_READ_PATH = os.getenv('API_FAST_READ_PATH', default='1') == '1'
+
+API_FANOUT_WORKERS = int(os.getenv('API_FANOUT_WORKERS', default=0))
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -112,11 +158,24 @@ AUTH_USER_MODEL = 'users.CustomUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.v1.authentication.ClaimsJWTAuthentication',
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.v1.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=0)),
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.getenv('THROTTLE_AUTH_IP_RATE', default='20/min') or None,
+        'auth_user': os.getenv('THROTTLE_AUTH_USER_RATE', default='5/min') or None,
+        'content_write': os.getenv('THROTTLE_CONTENT_WRITE_RATE', default='30/min') or None,
+        'admin_write': os.getenv('THROTTLE_ADMIN_WRITE_RATE', default='300/min') or None,
+    },
 }
 
 SIMPLE_JWT = {
@@ -124,9 +183,56 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+RANKING_SIZE = int(os.getenv('RANKING_SIZE', default=50))
+RANKING_MIN_VOTES = int(os.getenv('RANKING_MIN_VOTES', default=10))
+RANKING_REFRESH_INTERVAL = float(os.getenv('RANKING_REFRESH_INTERVAL', default=3600))
+
+CHANGES_PAGE_SIZE = int(os.getenv('CHANGES_PAGE_SIZE', default=500))
+CHANGES_MAX_PAGE_SIZE = int(os.getenv('CHANGES_MAX_PAGE_SIZE', default=1000))
+CHANGES_SETTLE_DELAY = float(os.getenv('CHANGES_SETTLE_DELAY', default=5))
+CHANGES_COMPACT_INTERVAL = float(os.getenv('CHANGES_COMPACT_INTERVAL', default=300))
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', default='1') == '1'
+
+REQUEST_TIMING = os.getenv('REQUEST_TIMING', default='0') == '1'
+REQUEST_QUERY_BUDGET = int(os.getenv('REQUEST_QUERY_BUDGET', default=20))
+REQUEST_TIME_BUDGET = float(os.getenv('REQUEST_TIME_BUDGET', default=500))
+REQUEST_SLOW_SQL_COUNT = int(os.getenv('REQUEST_SLOW_SQL_COUNT', default=5))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'performance': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'api.performance': {
+            'handlers': ['performance'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+USER_CACHE_TIMEOUT = int(os.getenv('USER_CACHE_TIMEOUT', default=60))
+USER_STATE_TIMEOUT = int(os.getenv('USER_STATE_TIMEOUT', default=60))
+
 DEFAULT_FROM_EMAIL = 'webmaster@localhost'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', default=100))
+OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', default=5))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', default=5))
+OUTBOX_RETRY_DELAY = int(os.getenv('OUTBOX_RETRY_DELAY', default=60))
+OUTBOX_MAX_RETRY_DELAY = int(os.getenv('OUTBOX_MAX_RETRY_DELAY', default=3600))
+OUTBOX_LEASE_TIMEOUT = int(os.getenv('OUTBOX_LEASE_TIMEOUT', default=600))
+
 TIME_ZONE = 'UTC'
 USE_TZ = True
@@ -0,0 +1,169 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import QueryDict
+
+from api.v1.filters import TitleFilter
+from reviews.models import Title
+
+DEFAULT_SCENARIOS = (
+    'genre=bench-genre-1',
+    'genre=bench-genre-1,bench-genre-2',
+    'genre=bench-genre-1,bench-genre-2&genre_mode=all',
+    'genre=bench-genre-1,bench-genre-2,bench-genre-3&genre_mode=all',
+    'category=bench-category-1,bench-category-2',
+    'year_min=1990&year_max=1999',
+    'genre=bench-genre-3,bench-genre-4&category=bench-category-1'
+    '&year_min=2000',
+)
+PAGE_SIZE = 5
+
+
+def join_queryset(params):
+    """Фильтрация соединением с жанрами, как до подзапросов: DISTINCT
+    для режима any и отдельное соединение на каждый жанр для режима all.
+    """
+    queryset = Title.objects.all()
+    if 'genre' in params:
+        slugs = params['genre'].split(',')
+        if params.get('genre_mode') == TitleFilter.GENRE_ALL:
+            for slug in slugs:
+                queryset = queryset.filter(genre__slug=slug)
+        else:
+            queryset = queryset.filter(genre__slug__in=slugs).distinct()
+    if 'category' in params:
+        queryset = queryset.filter(
+            category__slug__in=params['category'].split(',')
+        )
+    if 'year_min' in params:
+        queryset = queryset.filter(year__gte=params['year_min'])
+    if 'year_max' in params:
+        queryset = queryset.filter(year__lte=params['year_max'])
+    return queryset
+
+
+class Command(BaseCommand):
+    help = ('замер фильтрации произведений по нескольким жанрам, '
+            'категориям и диапазону лет на сгенерированном каталоге; '
+            'каталог создается в транзакции и удаляется после замера')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--titles',
+            type=int,
+            default=1000000,
+            help='количество произведений в каталоге',
+        )
+        parser.add_argument(
+            '--genres',
+            type=int,
+            default=20,
+            help='количество жанров, у произведения от 1 до 3 жанров',
+        )
+        parser.add_argument(
+            '--categories',
+            type=int,
+            default=5,
+            help='количество категорий',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='количество повторов каждого запроса',
+        )
+        parser.add_argument(
+            '--query',
+            action='append',
+            help='параметры фильтра для замера (можно повторять)',
+        )
+
+    def fill(self, cursor, titles, genres, categories):
+        """Заполняет каталог средствами PostgreSQL без загрузки
+        объектов в Python. Год, категория и жанры выбираются случайно
+        с постоянным зерном, чтобы замеры были воспроизводимы.
+        """
+        cursor.execute('SELECT setseed(0.5)')
+        cursor.execute(
+            "INSERT INTO reviews_category (name, slug, created, modified) "
+            "SELECT 'bench ' || i, 'bench-category-' || i, now(), now() "
+            "FROM generate_series(1, %s) AS i", [categories]
+        )
+        cursor.execute(
+            "INSERT INTO reviews_genre (name, slug, created, modified) "
+            "SELECT 'bench ' || i, 'bench-genre-' || i, now(), now() "
+            "FROM generate_series(1, %s) AS i", [genres]
+        )
+        cursor.execute(
+            "CREATE TEMPORARY TABLE bench_title ON COMMIT DROP AS "
+            "SELECT i, 1900 + floor(random() * 125)::int AS year, "
+            "1 + floor(random() * %s)::int AS category, "
+            "1 + floor(random() * 3)::int AS genres "
+            "FROM generate_series(1, %s) AS i",
+            [categories, titles]
+        )
+        cursor.execute(
+            "INSERT INTO reviews_title (name, year, category_id, score_sum, "
+            "score_count, created, modified) "
+            "SELECT 'bench ' || b.i, b.year, c.id, 0, 0, now(), now() "
+            "FROM bench_title AS b JOIN reviews_category AS c "
+            "ON c.slug = 'bench-category-' || b.category"
+        )
+        cursor.execute(
+            "INSERT INTO reviews_title_genre (title_id, genre_id) "
+            "SELECT l.title_id, g.id FROM ("
+            "SELECT t.id AS title_id, "
+            "1 + floor(random() * %s)::int AS genre "
+            "FROM bench_title AS b "
+            "JOIN reviews_title AS t ON t.name = 'bench ' || b.i "
+            "CROSS JOIN generate_series(1, b.genres)"
+            ") AS l JOIN reviews_genre AS g "
+            "ON g.slug = 'bench-genre-' || l.genre "
+            "ON CONFLICT DO NOTHING",
+            [genres]
+        )
+        cursor.execute('ANALYZE')
+
+    def measure(self, queryset, repeat):
+        """Среднее время подсчета и чтения первой страницы в мс."""
+        ids = queryset.order_by('-year', 'pk').values_list('pk', flat=True)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            count = queryset.count()
+            list(ids[:PAGE_SIZE])
+        return (time.perf_counter() - started) / repeat * 1000, count
+
+    def run(self, scenarios, repeat):
+        for query in scenarios:
+            params = QueryDict(query)
+            filterset = TitleFilter(params, queryset=Title.objects.all())
+            if not filterset.is_valid():
+                raise CommandError(f'{query}: {filterset.errors.as_text()}')
+            join_ms, join_count = self.measure(
+                join_queryset(params), repeat
+            )
+            subquery_ms, count = self.measure(filterset.qs, repeat)
+            same = 'совпадает' if count == join_count else (
+                f'РАЗЛИЧАЕТСЯ ({join_count})'
+            )
+            self.stdout.write(
+                f'{query}: соединение {join_ms:.1f} мс, подзапрос '
+                f'{subquery_ms:.1f} мс, найдено {count}, количество {same}'
+            )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Замер выполняется только в PostgreSQL')
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                started = time.perf_counter()
+                self.fill(cursor, options['titles'], options['genres'],
+                          options['categories'])
+            self.stdout.write(
+                f'Каталог из {options["titles"]} произведений создан '
+                f'за {time.perf_counter() - started:.0f} с'
+            )
+            self.run(options['query'] or DEFAULT_SCENARIOS,
+                     options['repeat'])
+            transaction.set_rollback(True)
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+DEFAULT_URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?fields=id,name,rating',
+    '/api/v1/genres/',
+    '/api/v1/categories/',
+)
+WARMUP_REQUESTS = 5
+
+
+class Command(BaseCommand):
+    help = ('сравнение пропускной способности чтения через сериалайзеры '
+            'и через values() на данных текущей базы')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='количество запросов к каждому адресу в каждом режиме',
+        )
+        parser.add_argument(
+            '--url',
+            action='append',
+            help='адрес для замера (можно повторять)',
+        )
+
+    def measure(self, client, url, fast, count):
+        """Возвращает число запросов в секунду и тело последнего ответа.
+        Кеш ответов отключается, чтобы замерять построение ответа.
+        """
+        with override_settings(API_FAST_READ_PATH=fast,
+                               RESPONSE_CACHE_TIMEOUT=0):
+            for _ in range(WARMUP_REQUESTS):
+                client.get(url)
+            started = time.perf_counter()
+            for _ in range(count):
+                response = client.get(url)
+            elapsed = time.perf_counter() - started
+        return count / elapsed, response.content
+
+    def handle(self, *args, **options):
+        client = Client()
+        count = options['requests']
+        for url in options['url'] or DEFAULT_URLS:
+            slow, slow_content = self.measure(client, url, False, count)
+            fast, fast_content = self.measure(client, url, True, count)
+            same = 'совпадают' if slow_content == fast_content else (
+                'РАЗЛИЧАЮТСЯ'
+            )
+            self.stdout.write(
+                f'{url}: сериалайзеры {slow:.0f} запр/с, values() '
+                f'{fast:.0f} запр/с, ускорение {fast / slow:.2f}x, '
+                f'ответы {same}'
+            )
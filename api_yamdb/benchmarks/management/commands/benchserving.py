@@ -0,0 +1,136 @@
+import os
+import shutil
+import socket
+import subprocess
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.models import Title
+
+MODES = {
+    'wsgi': ('api_yamdb.wsgi:application', 'sync'),
+    'asgi': ('api_yamdb.asgi:application', 'uvicorn.workers.UvicornH11Worker'),
+}
+STARTUP_TIMEOUT = 30
+WARMUP_REQUESTS = 20
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = ('сравнение пропускной способности и задержек gunicorn '
+            'в режимах WSGI и ASGI с одинаковым числом воркеров')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='количество воркеров gunicorn в обоих режимах',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='количество запросов к каждому адресу в каждом режиме',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='количество одновременных запросов',
+        )
+        parser.add_argument(
+            '--fanout-workers',
+            type=int,
+            default=4,
+            help='значение API_FANOUT_WORKERS для запущенных серверов',
+        )
+        parser.add_argument(
+            '--url',
+            action='append',
+            help='адрес для замера (можно повторять)',
+        )
+
+    def default_urls(self):
+        title = Title.objects.order_by('-score_count').first()
+        if title is None:
+            raise CommandError('В базе нет произведений')
+        return (
+            f'/api/v1/titles/{title.pk}/?expand=reviews,stats',
+            '/api/v1/titles/',
+        )
+
+    def start(self, mode, port, options):
+        app, worker_class = MODES[mode]
+        env = dict(os.environ, RESPONSE_CACHE_TIMEOUT='0',
+                   API_FANOUT_WORKERS=str(options['fanout_workers']))
+        gunicorn = shutil.which('gunicorn')
+        if gunicorn is None:
+            raise CommandError('gunicorn не установлен')
+        server = subprocess.Popen(
+            [gunicorn, app,
+             '--bind', f'127.0.0.1:{port}',
+             '--workers', str(options['workers']),
+             '--worker-class', worker_class],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), 1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'Сервер {mode} не запустился')
+
+    def fetch(self, url):
+        started = time.perf_counter()
+        with urllib.request.urlopen(url) as response:
+            response.read()
+        return time.perf_counter() - started
+
+    def measure(self, url, options):
+        """Возвращает число запросов в секунду и задержки запросов."""
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            list(pool.map(self.fetch, [url] * WARMUP_REQUESTS))
+            started = time.perf_counter()
+            latencies = list(pool.map(self.fetch,
+                                      [url] * options['requests']))
+            elapsed = time.perf_counter() - started
+        return options['requests'] / elapsed, latencies
+
+    def handle(self, *args, **options):
+        urls = options['url'] or self.default_urls()
+        for mode in MODES:
+            port = free_port()
+            server = self.start(mode, port, options)
+            try:
+                for url in urls:
+                    rps, latencies = self.measure(
+                        f'http://127.0.0.1:{port}{url}', options
+                    )
+                    self.stdout.write(
+                        f'{mode} {url}: {rps:.0f} запр/с, '
+                        f'p50 {percentile(latencies, 0.5) * 1000:.1f} мс, '
+                        f'p95 {percentile(latencies, 0.95) * 1000:.1f} мс, '
+                        f'p99 {percentile(latencies, 0.99) * 1000:.1f} мс'
+                    )
+            finally:
+                server.terminate()
+                server.wait()
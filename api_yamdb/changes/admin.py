@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from changes.models import Change
+
+
+@admin.register(Change)
+class ChangeAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'model', 'key', 'deleted', 'changed')
+    list_filter = ('model', 'deleted')
+    search_fields = ('key',)
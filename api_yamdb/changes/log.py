@@ -0,0 +1,78 @@
+from django.db import models, transaction
+
+from changes.models import Change
+
+RECORD_BATCH_SIZE = 1000
+COMPACT_BATCH_SIZE = 10000
+SLUG_KEYED = (Change.GENRE, Change.CATEGORY)
+
+
+def change_key(instance):
+    """Ключ объекта в журнале: slug для жанров и категорий,
+    по которому они доступны в API, и id для остальных объектов.
+    """
+    if instance._meta.model_name in SLUG_KEYED:
+        return instance.slug
+    return str(instance.pk)
+
+
+def record_changes(model, keys, deleted=False):
+    """Записывает изменение или удаление объектов типа model после
+    фиксации текущей транзакции.
+    Номера записей выдаются при вставке, поэтому запись внутри долгой
+    транзакции получила бы номер раньше, чем стала видна, и клиент,
+    уже прошедший этот номер, потерял бы ее. Записи вставляются
+    короткими транзакциями по RECORD_BATCH_SIZE сразу после фиксации
+    и видны почти сразу после получения номера; этот промежуток
+    закрывает CHANGES_SETTLE_DELAY. Журнал только дополняется, без
+    блокировок прежних записей объекта; устаревшие записи удаляет
+    compact_changes.
+    """
+    keys = list(dict.fromkeys(str(key) for key in keys))
+    if keys:
+        transaction.on_commit(lambda: insert_changes(model, keys, deleted))
+
+
+def insert_changes(model, keys, deleted):
+    for start in range(0, len(keys), RECORD_BATCH_SIZE):
+        with transaction.atomic():
+            Change.objects.bulk_create(
+                Change(model=model, key=key, deleted=deleted)
+                for key in keys[start:start + RECORD_BATCH_SIZE]
+            )
+
+
+def record_objects(objects, deleted=False):
+    """Записывает изменение объектов одной модели."""
+    if objects:
+        record_changes(objects[0]._meta.model_name,
+                       [change_key(obj) for obj in objects], deleted)
+
+
+def compact_changes(batch_size=COMPACT_BATCH_SIZE):
+    """Удаляет записи, после которых в журнале есть более новая запись
+    того же объекта. Клиент, еще не дошедший до удаленной записи,
+    получит объект по более новой. Журнал проходится один раз по
+    возрастанию номеров окнами по batch_size записей, и каждое окно
+    удаляется отдельным запросом. Возвращает количество удаленных
+    записей.
+    """
+    superseded = Change.objects.filter(
+        model=models.OuterRef('model'), key=models.OuterRef('key'),
+        id__gt=models.OuterRef('id'),
+    )
+    queryset = Change.objects.annotate(
+        superseded=models.Exists(superseded)
+    ).filter(superseded=True).values_list('id', flat=True)
+    ids = Change.objects.order_by('id').values_list('id', flat=True)
+    last_id = ids.last()
+    start = 0
+    total = 0
+    while last_id is not None and start < last_id:
+        end = ids.filter(id__gt=start)[batch_size - 1:batch_size].first()
+        end = last_id if end is None else min(end, last_id)
+        window = list(queryset.filter(id__gt=start, id__lte=end))
+        if window:
+            total += Change.objects.filter(id__in=window).delete()[0]
+        start = end
+    return total
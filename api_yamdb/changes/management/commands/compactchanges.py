@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from changes.log import compact_changes
+
+
+class Command(BaseCommand):
+    help = ('удаление записей журнала изменений, после которых есть '
+            'более новая запись того же объекта')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='сжимать журнал периодически',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.CHANGES_COMPACT_INTERVAL,
+            help='пауза между сжатиями в секундах (для --loop)',
+        )
+
+    def compact(self):
+        started = time.monotonic()
+        count = compact_changes()
+        self.stdout.write(
+            f'удалено устаревших записей: {count} '
+            f'за {time.monotonic() - started:.1f} с'
+        )
+
+    def handle(self, *args, **options):
+        self.compact()
+        while options['loop']:
+            time.sleep(options['interval'])
+            self.compact()
@@ -0,0 +1,60 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+JOURNALED = (
+    ('category', 'slug'),
+    ('genre', 'slug'),
+    ('title', 'pk'),
+    ('review', 'pk'),
+    ('comment', 'pk'),
+)
+
+
+def fill_changes(apps, schema_editor):
+    """Записывает в журнал все существующие объекты, чтобы первая
+    синхронизация без токена получила весь каталог.
+    """
+    Change = apps.get_model('changes', 'Change')
+    for model, key in JOURNALED:
+        keys = apps.get_model('reviews', model).objects.order_by(
+            'pk'
+        ).values_list(key, flat=True)
+        Change.objects.bulk_create(
+            (Change(model=model, key=str(value))
+             for value in keys.iterator()),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('reviews', '0009_created_modified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(choices=[('title', 'Произведение'), ('genre', 'Жанр'), ('category', 'Категория'), ('review', 'Отзыв'), ('comment', 'Комментарий')], max_length=16, verbose_name='Тип объекта')),
+                ('key', models.CharField(max_length=50, verbose_name='id или slug объекта')),
+                ('deleted', models.BooleanField(default=False, verbose_name='Объект удален')),
+                ('changed', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Изменение',
+                'verbose_name_plural': 'Изменения',
+                'ordering': ('id',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['model', 'key'], name='change_model_key_idx'),
+        ),
+        migrations.RunPython(fill_changes, migrations.RunPython.noop),
+    ]
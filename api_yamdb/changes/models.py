@@ -0,0 +1,54 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Change(models.Model):
+    """Модель записи журнала изменений каталога.
+    Каждое изменение добавляет запись, а устаревшие записи объекта
+    периодически удаляются (команда compactchanges), поэтому журнал
+    не растет при повторных изменениях, а удаленные объекты остаются
+    в нем отметками об удалении. Номер записи служит токеном
+    синхронизации.
+    """
+    TITLE = 'title'
+    GENRE = 'genre'
+    CATEGORY = 'category'
+    REVIEW = 'review'
+    COMMENT = 'comment'
+    MODELS = (
+        (TITLE, 'Произведение'),
+        (GENRE, 'Жанр'),
+        (CATEGORY, 'Категория'),
+        (REVIEW, 'Отзыв'),
+        (COMMENT, 'Комментарий'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(
+        verbose_name='Тип объекта',
+        max_length=16,
+        choices=MODELS,
+    )
+    key = models.CharField(
+        verbose_name='id или slug объекта',
+        max_length=50,
+    )
+    deleted = models.BooleanField(
+        verbose_name='Объект удален',
+        default=False,
+    )
+    changed = models.DateTimeField(
+        verbose_name='Дата изменения',
+        default=timezone.now,
+    )
+
+    class Meta:
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Изменения'
+        ordering = ('id',)
+        indexes = (
+            models.Index(fields=('model', 'key'), name='change_model_key_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.model} {self.key}'
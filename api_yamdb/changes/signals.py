@@ -0,0 +1,92 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from changes.log import change_key, record_changes
+from changes.models import Change
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def object_saved(sender, instance, **kwargs):
+    record_changes(sender._meta.model_name, [change_key(instance)])
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def object_deleted(sender, instance, **kwargs):
+    """Оставляет в журнале отметку об удалении объекта.
+    Срабатывает и при каскадном удалении.
+    """
+    record_changes(sender._meta.model_name, [change_key(instance)],
+                   deleted=True)
+
+
+@receiver(pre_save, sender=Genre)
+@receiver(pre_save, sender=Category)
+def slug_renamed(sender, instance, **kwargs):
+    """При смене slug объект по старому адресу считается удаленным."""
+    if instance.pk is None:
+        return
+    previous = sender.objects.filter(pk=instance.pk).values_list(
+        'slug', flat=True
+    ).first()
+    if previous is not None and previous != instance.slug:
+        record_changes(sender._meta.model_name, [previous], deleted=True)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def rating_changed(sender, instance, **kwargs):
+    """Отзыв меняет рейтинг произведения, поэтому изменение
+    записывается и для произведения.
+    """
+    record_changes(Change.TITLE, [instance.title_id])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Записывает изменение произведений, у которых изменился набор
+    жанров. При очистке жанра произведения берутся до удаления связей.
+    """
+    if reverse and action == 'pre_clear':
+        keys = Title.objects.filter(genre=instance).values_list(
+            'pk', flat=True
+        )
+    elif action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    elif reverse:
+        keys = pk_set or ()
+    else:
+        keys = [instance.pk]
+    record_changes(Change.TITLE, keys)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def genre_changed(sender, instance, **kwargs):
+    """Жанры встроены в ответ произведения, поэтому их изменение
+    записывается для всех произведений жанра.
+    """
+    record_changes(Change.TITLE, Title.objects.filter(
+        genre=instance
+    ).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """Категория встроена в ответ произведения, поэтому ее изменение
+    записывается для всех произведений категории.
+    """
+    record_changes(Change.TITLE, Title.objects.filter(
+        category=instance
+    ).values_list('pk', flat=True))
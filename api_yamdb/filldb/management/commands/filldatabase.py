@@ -1,16 +1,37 @@
 import csv
 import datetime
+import io
 import logging
 import os
 import sys
+import time
+from itertools import islice
 
 from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
 
+from changes.log import record_changes, record_objects
+from changes.models import Change
 from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.versions import bump_versions
 from users.models import CustomUser
 
 CSV_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+DEFAULT_BATCH_SIZE = 5000
+
+TABLES = (
+    ('users', 'users.csv', CustomUser),
+    ('category', 'category.csv', Category),
+    ('genre', 'genre.csv', Genre),
+    ('titles', 'titles.csv', Title),
+    ('genre_title', 'genre_title.csv', Title.genre.through),
+    ('review', 'review.csv', Review),
+    ('comments', 'comments.csv', Comment),
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,65 +41,204 @@ logging.basicConfig(
 
 
 def read_file(filename):
+    """Построчно читает csv-файл, пропуская заголовок."""
     filepath = os.path.join(CSV_DIR, filename)
-    with open(filepath, 'r', encoding='utf-8') as f:
-        reader = list(csv.reader(f))
-    reader.pop(0)
-    return reader
-
-
-def create_object(DBclass, row):
-    if DBclass == CustomUser:
-        kwargs = {'pk': int(row[0]), 'username': row[1], 'email': row[2],
-                  'role': row[3]}
-    elif DBclass == Category:
-        kwargs = {'pk': int(row[0]), 'name': row[1], 'slug': row[2]}
-    elif DBclass == Genre:
-        kwargs = {'pk': int(row[0]), 'name': row[1], 'slug': row[2]}
-    elif DBclass == Title:
-        kwargs = {'pk': int(row[0]), 'name': row[1], 'year': row[2],
-                  'category': Category.objects.get(pk=int(row[3]))}
-    elif DBclass == Review:
-        kwargs = {'pk': int(row[0]),
-                  'title': Title.objects.get(pk=int(row[1])),
-                  'text': row[2],
-                  'author': (CustomUser.objects.get(pk=int(row[3]))),
-                  'score': int(row[4]),
-                  'pub_date': (datetime.datetime.
-                               strptime(row[5], '%Y-%m-%dT%H:%M:%S.%fZ'))}
-    elif DBclass == Comment:
-        kwargs = {'pk': int(row[0]),
-                  'review': Review.objects.get(pk=int(row[1])),
-                  'text': row[2],
-                  'author': (CustomUser.objects.get(pk=int(row[3]))),
-                  'pub_date': (datetime.datetime.
-                               strptime(row[4], '%Y-%m-%dT%H:%M:%S.%fZ'))}
-    DBclass.objects.create(**kwargs)
-
-
-def addGenre(filename):
-    reader = read_file(filename)
-    for row in reader:
-        title = Title.objects.get(pk=int(row[1]))
-        genre = Genre.objects.get(pk=int(row[2]))
-        genre.title_genre.add(title)
-
-
-def read_to_DB(filename, DBclass):
-    reader = read_file(filename)
-    for row in reader:
-        create_object(DBclass, row)
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        yield from reader
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def parse_date(value):
+    return datetime.datetime.strptime(value, DATE_FORMAT).replace(
+        tzinfo=datetime.timezone.utc
+    )
+
+
+def copy_value(value):
+    """Значение поля в формате csv для COPY: NULL - пустая строка
+    без кавычек, все остальные значения берутся в кавычки.
+    """
+    if value is None:
+        return ''
+    return '"{}"'.format(str(value).replace('"', '""'))
+
+
+def copy_objects(DBclass, objects):
+    """Записывает объекты в таблицу командой COPY (только PostgreSQL)."""
+    fields = DBclass._meta.concrete_fields
+    buffer = io.StringIO()
+    for obj in objects:
+        buffer.write(','.join(
+            copy_value(field.get_db_prep_save(
+                field.pre_save(obj, add=True), connection
+            ))
+            for field in fields
+        ))
+        buffer.write('\n')
+    buffer.seek(0)
+    columns = ', '.join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+    table = connection.ops.quote_name(DBclass._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)', buffer
+        )
+
+
+class Loader:
+    """Загрузчик csv-файлов в базу данных.
+    Внешние ключи проверяются по множествам уже известных id,
+    а объекты записываются пачками.
+    """
+
+    def __init__(self, batch_size, use_copy):
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+        self.ids = {}
+
+    def known_ids(self, DBclass):
+        if DBclass not in self.ids:
+            self.ids[DBclass] = set(
+                DBclass.objects.values_list('pk', flat=True)
+            )
+        return self.ids[DBclass]
+
+    def resolve(self, DBclass, value):
+        pk = int(value)
+        if pk not in self.known_ids(DBclass):
+            return None
+        return pk
+
+    def build_users(self, row):
+        return CustomUser(pk=int(row[0]), username=row[1], email=row[2],
+                          role=row[3])
+
+    def build_category(self, row):
+        return Category(pk=int(row[0]), name=row[1], slug=row[2])
+
+    def build_genre(self, row):
+        return Genre(pk=int(row[0]), name=row[1], slug=row[2])
+
+    def build_titles(self, row):
+        category_id = self.resolve(Category, row[3])
+        if category_id is None:
+            return None
+        return Title(pk=int(row[0]), name=row[1], year=row[2],
+                     category_id=category_id)
+
+    def build_genre_title(self, row):
+        title_id = self.resolve(Title, row[1])
+        genre_id = self.resolve(Genre, row[2])
+        if title_id is None or genre_id is None:
+            return None
+        return Title.genre.through(pk=int(row[0]), title_id=title_id,
+                                   genre_id=genre_id)
+
+    def build_review(self, row):
+        title_id = self.resolve(Title, row[1])
+        author_id = self.resolve(CustomUser, row[3])
+        if title_id is None or author_id is None:
+            return None
+        return Review(pk=int(row[0]), title_id=title_id, text=row[2],
+                      author_id=author_id, score=int(row[4]),
+                      pub_date=parse_date(row[5]))
+
+    def build_comments(self, row):
+        review_id = self.resolve(Review, row[1])
+        author_id = self.resolve(CustomUser, row[3])
+        if review_id is None or author_id is None:
+            return None
+        return Comment(pk=int(row[0]), review_id=review_id, text=row[2],
+                       author_id=author_id, pub_date=parse_date(row[4]))
+
+    def write(self, DBclass, objects):
+        if self.use_copy:
+            copy_objects(DBclass, objects)
+        else:
+            DBclass.objects.bulk_create(objects)
+        self.known_ids(DBclass).update(obj.pk for obj in objects)
+        self.record(DBclass, objects)
+
+    def record(self, DBclass, objects):
+        """Записывает загруженные объекты в журнал изменений, а для
+        связей с жанрами и отзывов - и их произведения.
+        """
+        if DBclass is Title.genre.through or DBclass is Review:
+            record_changes(Change.TITLE, {obj.title_id for obj in objects})
+        if DBclass is not CustomUser and DBclass is not Title.genre.through:
+            record_objects(objects)
+
+    def load(self, name, filename, DBclass):
+        build = getattr(self, f'build_{name}')
+        started = time.monotonic()
+        loaded = skipped = 0
+        for rows in batched(read_file(filename), self.batch_size):
+            objects = []
+            for row in rows:
+                obj = build(row)
+                if obj is None:
+                    skipped += 1
+                else:
+                    objects.append(obj)
+            self.write(DBclass, objects)
+            loaded += len(objects)
+            elapsed = time.monotonic() - started
+            logging.info('%s: загружено %d строк (%.0f строк/с)',
+                         name, loaded, loaded / elapsed if elapsed else 0)
+        if skipped:
+            logging.warning('%s: пропущено %d строк с неизвестными '
+                            'внешними ключами', name, skipped)
+        return loaded
 
 
 class Command(BaseCommand):
     help = 'заполнение базы данных из csv файлов'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='количество строк, записываемых за один запрос',
+        )
+        parser.add_argument(
+            '--only',
+            action='append',
+            choices=[name for name, _, _ in TABLES],
+            help='загрузить только указанную таблицу (можно повторять)',
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='использовать bulk_create вместо COPY в PostgreSQL',
+        )
+
     def handle(self, *args, **options):
-        read_to_DB('users.csv', CustomUser)
-        read_to_DB('category.csv', Category)
-        read_to_DB('genre.csv', Genre)
-        read_to_DB('titles.csv', Title)
-        addGenre('genre_title.csv')
-        read_to_DB('review.csv', Review)
-        read_to_DB('comments.csv', Comment)
+        use_copy = (connection.vendor == 'postgresql'
+                    and not options['no_copy'])
+        loader = Loader(options['batch_size'], use_copy)
+        only = options['only']
+        tables = [table for table in TABLES if not only or table[0] in only]
+        with transaction.atomic():
+            for name, filename, model in tables:
+                loader.load(name, filename, model)
+            models = [model for _, _, model in tables]
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(),
+                                                             models):
+                    cursor.execute(sql)
+            if Title in models or Review in models:
+                call_command('rebuildratings')
+        bump_versions('category', 'genre', 'title', 'review')
         logging.info('база данных готова')
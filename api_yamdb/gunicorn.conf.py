@@ -0,0 +1,22 @@
+import glob
+import os
+
+from prometheus_client import multiprocess
+
+workers = int(os.getenv('GUNICORN_WORKERS', default=1))
+threads = int(os.getenv('GUNICORN_THREADS', default=1))
+
+
+def on_starting(server):
+    """Удаляет файлы метрик, оставшиеся от предыдущего запуска."""
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        os.makedirs(path, exist_ok=True)
+        for filename in glob.glob(os.path.join(path, '*.db')):
+            os.remove(filename)
+
+
+def child_exit(server, worker):
+    """Переносит метрики завершившегося воркера в общие файлы."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
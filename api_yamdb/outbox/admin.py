@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from outbox.models import Email
+
+
+@admin.register(Email)
+class EmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipient', 'subject', 'status', 'attempts',
+                    'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    empty_value_display = '-пусто-'
+    ordering = ('-pk',)
@@ -0,0 +1,137 @@
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from prometheus_client import Counter
+
+from outbox.models import Email
+
+logger = logging.getLogger(__name__)
+
+EMAILS = Counter(
+    'yamdb_emails_total',
+    'Результаты попыток отправки писем',
+    ('outcome',),
+)
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь; отправку выполняет команда sendemails."""
+    Email.objects.bulk_create(
+        Email(subject=subject, body=message, from_email=from_email,
+              recipient=recipient)
+        for recipient in recipient_list
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой отправки."""
+    delay = settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return datetime.timedelta(
+        seconds=min(delay, settings.OUTBOX_MAX_RETRY_DELAY)
+    )
+
+
+def save_result(email):
+    """Сохраняет результат попытки отдельным UPDATE вне транзакции пачки,
+    чтобы после сбоя воркера не отправлять повторно уже отправленные письма.
+    """
+    Email.objects.filter(pk=email.pk).update(
+        status=email.status, attempts=email.attempts,
+        next_attempt_at=email.next_attempt_at, last_error=email.last_error,
+        sent_at=email.sent_at,
+    )
+
+
+def mark_failed(email, error):
+    now = timezone.now()
+    email.attempts += 1
+    email.last_error = str(error) or error.__class__.__name__
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = Email.FAILED
+        EMAILS.labels('failed').inc()
+    else:
+        email.status = Email.PENDING
+        email.next_attempt_at = now + retry_delay(email.attempts)
+        EMAILS.labels('retry').inc()
+    save_result(email)
+    logger.warning('письмо %s не отправлено (попытка %d): %s',
+                   email.pk, email.attempts, email.last_error)
+
+
+def mark_sent(email):
+    email.status = Email.SENT
+    email.sent_at = timezone.now()
+    email.attempts += 1
+    email.last_error = ''
+    save_result(email)
+    EMAILS.labels('sent').inc()
+
+
+def deliver(emails):
+    """Отправляет письма через одно соединение с почтовым сервером.
+    Ошибка соединения считается неудачной попыткой для всех писем пачки.
+    """
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error)
+        return
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject, body=email.body,
+                from_email=email.from_email, to=[email.recipient],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                mark_failed(email, error)
+            else:
+                mark_sent(email)
+    finally:
+        connection.close()
+
+
+def claim_pending(batch_size, due):
+    """Забирает пачку писем, время попытки которых наступило к моменту due,
+    в короткой транзакции: строки блокируются с пропуском уже
+    заблокированных и помечаются как отправляемые до истечения аренды
+    OUTBOX_LEASE_TIMEOUT. Письма воркера, упавшего во время отправки,
+    снова попадают в пачку после окончания аренды.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            Email.objects.select_for_update(skip_locked=True).filter(
+                status__in=(Email.PENDING, Email.SENDING),
+                next_attempt_at__lte=min(now, due),
+            ).order_by('next_attempt_at', 'pk')[:batch_size]
+        )
+        if emails:
+            Email.objects.filter(pk__in=[email.pk for email in emails]).update(
+                status=Email.SENDING,
+                next_attempt_at=now + datetime.timedelta(
+                    seconds=settings.OUTBOX_LEASE_TIMEOUT
+                ),
+            )
+    return emails
+
+
+def send_pending(batch_size, due=None):
+    """Отправляет одну пачку писем, время попытки которых наступило
+    (не позже due, если он задан). Пачка забирается в отдельной транзакции,
+    а письма отправляются вне ее, поэтому медленный почтовый сервер
+    не держит блокировки и соединение с базой в транзакции.
+    Возвращает количество обработанных писем.
+    """
+    emails = claim_pending(batch_size, due or timezone.now())
+    if emails:
+        deliver(emails)
+    return len(emails)
@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from prometheus_client import start_http_server
+
+from outbox.mail import send_pending
+
+
+class Command(BaseCommand):
+    help = 'отправка писем из очереди исходящей почты'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help='количество писем, отправляемых через одно соединение',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='не завершаться, а ждать новые письма',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.OUTBOX_POLL_INTERVAL,
+            help='пауза в секундах между разборами очереди (для --loop)',
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            help='порт, на котором отдавать метрики Prometheus (для --loop)',
+        )
+
+    def drain(self, batch_size):
+        """Разбирает письма, время попытки которых наступило к началу
+        разбора. Повторы, назначенные во время разбора (в том числе сразу
+        при OUTBOX_RETRY_DELAY=0), ждут следующего вызова.
+        """
+        due = timezone.now()
+        total = 0
+        while True:
+            processed = send_pending(batch_size, due)
+            total += processed
+            if processed < batch_size:
+                return total
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            total = self.drain(options['batch_size'])
+            self.stdout.write(f'Обработано писем: {total}')
+            return
+        if options['metrics_port']:
+            start_http_server(options['metrics_port'])
+        while True:
+            self.drain(options['batch_size'])
+            time.sleep(options['interval'])
@@ -0,0 +1,72 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Email(models.Model):
+    """Модель исходящего письма, ожидающего отправки воркером."""
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField(
+        verbose_name='Тема',
+        max_length=256,
+    )
+    body = models.TextField(
+        verbose_name='Текст письма',
+    )
+    from_email = models.CharField(
+        verbose_name='Отправитель',
+        max_length=254,
+    )
+    recipient = models.EmailField(
+        verbose_name='Получатель',
+        max_length=254,
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Количество попыток',
+        default=0,
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Время следующей попытки',
+        help_text='для отправляемого письма - окончание аренды воркера',
+        default=timezone.now,
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True,
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Дата отправки',
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'Письмо'
+        verbose_name_plural = 'Письма'
+        ordering = ('-created', )
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'],
+                         name='email_status_next_attempt_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
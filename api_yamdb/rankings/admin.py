@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from rankings.models import Ranking
+
+
+@admin.register(Ranking)
+class RankingAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'kind', 'key', 'refreshed_at')
+    list_filter = ('kind',)
+    ordering = ('kind', 'key')
@@ -0,0 +1,104 @@
+import heapq
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from rankings.models import Ranking, RankingEntry
+from reviews.models import Category, Title
+
+
+def bayesian_score(score_sum, score_count, mean, min_votes):
+    """Средняя оценка, сглаженная к средней по всем произведениям:
+    у произведений с малым числом оценок она ближе к общей средней.
+    """
+    return (score_sum + min_votes * mean) / (score_count + min_votes)
+
+
+def push(heap, item, size):
+    """Добавляет элемент в кучу, хранящую size лучших элементов."""
+    if len(heap) < size:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+def compute_rankings(size, min_votes):
+    """Считает взвешенные оценки всех произведений за один проход
+    по сохраненным суммам и количествам оценок и возвращает
+    словарь {(тип, ключ): [(оценка, количество, -id), ...]}.
+    """
+    rated = Title.objects.filter(score_count__gt=0)
+    totals = rated.aggregate(score_sum=Sum('score_sum'),
+                             score_count=Sum('score_count'))
+    if not totals['score_count']:
+        return {}
+    mean = totals['score_sum'] / totals['score_count']
+    categories = dict(Category.objects.values_list('pk', 'slug'))
+    genres = defaultdict(list)
+    links = Title.genre.through.objects.filter(
+        title__score_count__gt=0
+    ).values_list('title_id', 'genre__slug')
+    for title_id, slug in links.iterator():
+        genres[title_id].append(slug)
+    heaps = defaultdict(list)
+    titles = rated.order_by().values_list(
+        'pk', 'category_id', 'year', 'score_sum', 'score_count'
+    )
+    for pk, category_id, year, score_sum, score_count in titles.iterator():
+        item = (bayesian_score(score_sum, score_count, mean, min_votes),
+                score_count, -pk)
+        push(heaps[Ranking.YEAR, str(year)], item, size)
+        if category_id in categories:
+            push(heaps[Ranking.CATEGORY, categories[category_id]], item,
+                 size)
+        for slug in set(genres.get(pk, ())):
+            push(heaps[Ranking.GENRE, slug], item, size)
+    return {group: sorted(heap, reverse=True)
+            for group, heap in heaps.items()}
+
+
+def save_rankings(groups):
+    """Заменяет все сохраненные рейтинги рассчитанными в одной транзакции.
+    Расчет идет вне транзакции, и произведение могло быть удалено после
+    него, поэтому такие произведения исключаются из рейтингов перед
+    записью, а места пересчитываются. Возвращает количество рейтингов.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        existing = set(Title.objects.filter(pk__in={
+            -pk for items in groups.values() for _, _, pk in items
+        }).values_list('pk', flat=True))
+        groups = {
+            group: [item for item in items if -item[2] in existing]
+            for group, items in groups.items()
+        }
+        groups = {group: items for group, items in groups.items() if items}
+        Ranking.objects.all().delete()
+        rankings = [Ranking(kind=kind, key=key, refreshed_at=now)
+                    for kind, key in groups]
+        if connection.features.can_return_ids_from_bulk_insert:
+            Ranking.objects.bulk_create(rankings)
+        else:
+            for ranking in rankings:
+                ranking.save()
+        RankingEntry.objects.bulk_create(
+            (
+                RankingEntry(ranking=ranking, position=position,
+                             title_id=-pk, score=score,
+                             score_count=score_count)
+                for ranking, items in zip(rankings, groups.values())
+                for position, (score, score_count, pk)
+                in enumerate(items, start=1)
+            ),
+            batch_size=1000,
+        )
+    return len(rankings)
+
+
+def refresh_rankings(size, min_votes):
+    """Пересчитывает и заменяет все сохраненные рейтинги.
+    Возвращает количество рейтингов.
+    """
+    return save_rankings(compute_rankings(size, min_votes))
@@ -0,0 +1,61 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from rankings.compute import refresh_rankings
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ('пересчет рейтингов лучших произведений по жанрам, '
+            'категориям и годам')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=settings.RANKING_SIZE,
+            help='количество произведений в каждом рейтинге',
+        )
+        parser.add_argument(
+            '--min-votes',
+            type=int,
+            default=settings.RANKING_MIN_VOTES,
+            help='количество оценок, при котором средняя оценка '
+                 'произведения весит столько же, сколько общая средняя',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='пересчитывать рейтинги периодически',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.RANKING_REFRESH_INTERVAL,
+            help='пауза между пересчетами в секундах (для --loop)',
+        )
+
+    def refresh(self, options):
+        started = time.monotonic()
+        count = refresh_rankings(options['size'], options['min_votes'])
+        self.stdout.write(
+            f'пересчитано рейтингов: {count} '
+            f'за {time.monotonic() - started:.1f} с'
+        )
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            self.refresh(options)
+            return
+        while True:
+            try:
+                self.refresh(options)
+            except Exception:
+                logger.exception('ошибка пересчета рейтингов')
+                close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,54 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('reviews', '0008_title_score_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ranking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('genre', 'Жанр'), ('category', 'Категория'), ('year', 'Год выпуска')], max_length=16, verbose_name='Тип рейтинга')),
+                ('key', models.CharField(max_length=50, verbose_name='Slug жанра, категории или год выпуска')),
+                ('refreshed_at', models.DateTimeField(verbose_name='Дата пересчета')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг',
+                'verbose_name_plural': 'Рейтинги',
+                'ordering': ('kind', 'key'),
+            },
+        ),
+        migrations.CreateModel(
+            name='RankingEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Взвешенная оценка')),
+                ('score_count', models.PositiveIntegerField(verbose_name='Количество оценок')),
+                ('ranking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='rankings.Ranking', verbose_name='Рейтинг')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranking_entries', to='reviews.Title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Места в рейтинге',
+                'ordering': ('ranking', 'position'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ranking',
+            constraint=models.UniqueConstraint(fields=('kind', 'key'), name='unique_ranking_kind_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='rankingentry',
+            constraint=models.UniqueConstraint(fields=('ranking', 'position'), name='unique_ranking_position'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import models
+
+from reviews.models import Title
+
+
+class Ranking(models.Model):
+    """Модель рейтинга лучших произведений жанра, категории или года."""
+    GENRE = 'genre'
+    CATEGORY = 'category'
+    YEAR = 'year'
+    KINDS = (
+        (GENRE, 'Жанр'),
+        (CATEGORY, 'Категория'),
+        (YEAR, 'Год выпуска'),
+    )
+
+    kind = models.CharField(
+        verbose_name='Тип рейтинга',
+        max_length=16,
+        choices=KINDS,
+    )
+    key = models.CharField(
+        verbose_name='Slug жанра, категории или год выпуска',
+        max_length=50,
+    )
+    refreshed_at = models.DateTimeField(
+        verbose_name='Дата пересчета',
+    )
+
+    class Meta:
+        verbose_name = 'Рейтинг'
+        verbose_name_plural = 'Рейтинги'
+        ordering = ('kind', 'key')
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key'],
+                                    name='unique_ranking_kind_key')
+        ]
+
+    def __str__(self):
+        return f'{self.kind}: {self.key}'
+
+
+class RankingEntry(models.Model):
+    """Модель места произведения в рейтинге."""
+    ranking = models.ForeignKey(
+        Ranking,
+        on_delete=models.CASCADE,
+        related_name='entries',
+        verbose_name='Рейтинг',
+    )
+    position = models.PositiveSmallIntegerField(
+        verbose_name='Место',
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='ranking_entries',
+        verbose_name='Произведение',
+    )
+    score = models.FloatField(
+        verbose_name='Взвешенная оценка',
+    )
+    score_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+    )
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтинге'
+        ordering = ('ranking', 'position')
+        constraints = [
+            models.UniqueConstraint(fields=['ranking', 'position'],
+                                    name='unique_ranking_position')
+        ]
+
+    def __str__(self):
+        return f'{self.ranking}: {self.position}'
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from reviews.models import SCORES, Review, Title, TitleScoreStats
+from reviews.versions import bump_versions
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = ('пересчет сохраненных рейтингов и распределений оценок '
+            'произведений по отзывам')
+
+    def rebuild_score_stats(self):
+        """Заново заполняет таблицу распределений оценок
+        одним агрегирующим запросом по отзывам.
+        """
+        TitleScoreStats.objects.all().delete()
+        rows = Review.objects.order_by().values('title_id').annotate(**{
+            f'score_{score}': Count('pk', filter=Q(score=score))
+            for score in SCORES
+        })
+        created = TitleScoreStats.objects.bulk_create(
+            (TitleScoreStats(**row) for row in rows.iterator()),
+            batch_size=BATCH_SIZE,
+        )
+        return len(created)
+
+    def handle(self, *args, **options):
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        with transaction.atomic():
+            updated = Title.objects.update(
+                score_sum=Coalesce(Subquery(
+                    reviews.annotate(total=Sum('score')).values('total')
+                ), 0),
+                score_count=Coalesce(Subquery(
+                    reviews.annotate(total=Count('pk')).values('total')
+                ), 0),
+            )
+            stats = self.rebuild_score_stats()
+        bump_versions(Title._meta.model_name)
+        self.stdout.write(f'рейтинги пересчитаны для {updated} произведений')
+        self.stdout.write(
+            f'распределения оценок пересчитаны для {stats} произведений'
+        )
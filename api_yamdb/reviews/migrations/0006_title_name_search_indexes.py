@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:25
+
+from django.db import migrations
+
+
+def create_search_indexes(apps, schema_editor):
+    """Индексы для поиска по названию произведения в PostgreSQL:
+    btree для поиска по префиксу и, если доступно расширение pg_trgm,
+    GIN-индекс по триграммам для поиска по вхождению и с опечатками.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS title_name_prefix_idx '
+        'ON reviews_title (UPPER(name) text_pattern_ops)'
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS title_name_trgm_idx '
+        'ON reviews_title USING gin (UPPER(name) gin_trgm_ops)'
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS title_name_trgm_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS title_name_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:40
+
+from django.db import migrations
+
+
+def create_search_vector(apps, schema_editor):
+    """Колонка tsvector для полнотекстового поиска по отзывам.
+    Ее заполняет триггер, поэтому она актуальна и при массовой загрузке
+    данных в обход ORM.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE reviews_review ADD COLUMN search_vector tsvector'
+    )
+    schema_editor.execute(
+        'CREATE TRIGGER review_search_vector_update '
+        'BEFORE INSERT OR UPDATE OF text ON reviews_review '
+        'FOR EACH ROW EXECUTE PROCEDURE tsvector_update_trigger('
+        "search_vector, 'pg_catalog.russian', text)"
+    )
+    schema_editor.execute(
+        'UPDATE reviews_review '
+        "SET search_vector = to_tsvector('pg_catalog.russian', text)"
+    )
+    schema_editor.execute(
+        'CREATE INDEX review_search_vector_idx '
+        'ON reviews_review USING gin (search_vector)'
+    )
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'DROP TRIGGER IF EXISTS review_search_vector_update ON reviews_review'
+    )
+    schema_editor.execute(
+        'ALTER TABLE reviews_review DROP COLUMN IF EXISTS search_vector'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_name_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
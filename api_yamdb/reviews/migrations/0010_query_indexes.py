@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_created_modified'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-year'], name='title_category_year_idx'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='category',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='category', to='reviews.Category', verbose_name='Категория'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='category',
+            name='name_slug_unique_ctg',
+        ),
+        migrations.RemoveConstraint(
+            model_name='genre',
+            name='name_slug_unique_gnr',
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(unique=True, verbose_name='Адрес категории'),
+        ),
+        migrations.AlterField(
+            model_name='genre',
+            name='slug',
+            field=models.SlugField(unique=True, verbose_name='Адрес жанра'),
+        ),
+        migrations.RunSQL(
+            [
+                'CREATE INDEX title_genre_genre_title_idx '
+                'ON reviews_title_genre (genre_id, title_id)',
+                'DROP INDEX reviews_title_genre_genre_id_1872fed8',
+                'DROP INDEX reviews_title_genre_title_id_e8fa0cd2',
+            ],
+            [
+                'CREATE INDEX reviews_title_genre_title_id_e8fa0cd2 '
+                'ON reviews_title_genre (title_id)',
+                'CREATE INDEX reviews_title_genre_genre_id_1872fed8 '
+                'ON reviews_title_genre (genre_id)',
+                'DROP INDEX title_genre_genre_title_idx',
+            ],
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.utils import timezone
 
 from reviews.validators import validate_year
@@ -17,16 +18,22 @@ class Category(models.Model):
     slug = models.SlugField(
         verbose_name='Адрес категории',
         max_length=50,
+        unique=True,
+    )
+
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True,
+    )
+    modified = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
     )
 
     class Meta:
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
         ordering = ('name', )
-        constraints = [
-            models.UniqueConstraint(
-                fields=['name', 'slug'], name='name_slug_unique_ctg')
-        ]
 
     def __str__(self):
         return self.name
@@ -41,16 +48,22 @@ class Genre(models.Model):
     slug = models.SlugField(
         verbose_name='Адрес жанра',
         max_length=50,
+        unique=True,
+    )
+
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True,
+    )
+    modified = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
     )
 
     class Meta:
         verbose_name = 'Жанр'
         verbose_name_plural = 'Жанры'
         ordering = ('name', )
-        constraints = [
-            models.UniqueConstraint(
-                fields=['name', 'slug'], name='name_slug_unique_gnr')
-        ]
 
     def __str__(self):
         return self.name
@@ -83,16 +96,143 @@ class Title(models.Model):
         verbose_name='Категория',
         on_delete=models.SET_NULL,
         null=True,
+        db_index=False,
+    )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    score_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True,
+    )
+    modified = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
     )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('-year',)
+        indexes = (
+            models.Index(fields=('category', '-year'),
+                         name='title_category_year_idx'),
+        )
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка произведения, округленная вниз."""
+        if not self.score_count:
+            return None
+        return self.score_sum // self.score_count
+
+    @staticmethod
+    def update_score(title_id, score_delta, count_delta):
+        """Сдвигает сохраненные сумму и количество оценок произведения
+        и отмечает время изменения его отзывов.
+        """
+        Title.objects.filter(pk=title_id).update(
+            score_sum=F('score_sum') + score_delta,
+            score_count=F('score_count') + count_delta,
+            modified=timezone.now(),
+        )
+
+
+SCORES = range(1, 11)
+
+
+class TitleScoreStats(models.Model):
+    """Распределение оценок произведения по значениям от 1 до 10.
+    Обновляется вместе с отзывами, поэтому статистика читается
+    по первичному ключу без выборки отзывов.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_stats',
+        verbose_name='Произведение',
+    )
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    def __str__(self):
+        return f'Оценки произведения {self.title_id}'
+
+    @property
+    def histogram(self):
+        return {score: getattr(self, f'score_{score}') for score in SCORES}
+
+    @property
+    def count(self):
+        return sum(self.histogram.values())
+
+    @property
+    def average(self):
+        count = self.count
+        if not count:
+            return None
+        total = sum(score * n for score, n in self.histogram.items())
+        return round(total / count, 2)
+
+    @property
+    def median(self):
+        """Медиана оценок, найденная по накопленным корзинам."""
+        count = self.count
+        if not count:
+            return None
+        middle = ((count - 1) // 2, count // 2)
+        values = []
+        seen = 0
+        for score, n in self.histogram.items():
+            values.extend(score for position in middle
+                          if seen <= position < seen + n)
+            seen += n
+        return sum(values) / 2
+
+    @staticmethod
+    def shift(title_id, removed=None, added=None):
+        """Переносит одну оценку произведения из корзины removed
+        в корзину added; любая из них может отсутствовать.
+        """
+        if removed == added:
+            return
+        changes = {}
+        if removed is not None:
+            changes[f'score_{removed}'] = F(f'score_{removed}') - 1
+        if added is not None:
+            changes[f'score_{added}'] = F(f'score_{added}') + 1
+        stats = TitleScoreStats.objects.filter(pk=title_id)
+        if stats.update(**changes) or added is None:
+            return
+        _, created = TitleScoreStats.objects.get_or_create(
+            title_id=title_id, defaults={f'score_{added}': 1}
+        )
+        if not created:
+            stats.update(**changes)
+
 
 class Review(models.Model):
     """Модель для отзыва."""
@@ -123,19 +263,50 @@ class Review(models.Model):
                 limit_value=10, message='Оценка не может быть больше 10'
             )]
     )
+    modified = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+    )
 
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
         constraints = (
             models.UniqueConstraint(fields=('author', 'title'),
                                     name='unique_author_title'),
         )
+        indexes = (
+            models.Index(fields=('title', '-pub_date', '-id'),
+                         name='review_title_pub_date_idx'),
+        )
 
     def __str__(self):
         return f'Произведение: {str(self.title)[:15]}, Автор: {self.author}'
 
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв и обновляет рейтинг и распределение оценок
+        произведения в одной транзакции.
+        """
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = Review.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values_list('title_id', 'score').first()
+            super().save(*args, **kwargs)
+            if previous is None:
+                Title.update_score(self.title_id, self.score, 1)
+                TitleScoreStats.shift(self.title_id, added=self.score)
+            elif previous[0] == self.title_id:
+                Title.update_score(self.title_id, self.score - previous[1], 0)
+                TitleScoreStats.shift(self.title_id, previous[1], self.score)
+            else:
+                Title.update_score(previous[0], -previous[1], -1)
+                TitleScoreStats.shift(previous[0], removed=previous[1])
+                Title.update_score(self.title_id, self.score, 1)
+                TitleScoreStats.shift(self.title_id, added=self.score)
+
 
 class Comment(models.Model):
     """Модель для комментария к отзыву."""
@@ -156,11 +327,19 @@ class Comment(models.Model):
         related_name='comments',
         verbose_name='Отзыв'
     )
+    modified = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+    )
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(fields=('review', '-pub_date', '-id'),
+                         name='comment_review_pub_date_idx'),
+        )
 
     def __str__(self):
         return self.text[:15]
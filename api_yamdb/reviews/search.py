@@ -0,0 +1,92 @@
+from django.contrib.postgres.lookups import PostgresSimpleLookup
+from django.db import connections
+from django.db.models import (BooleanField, CharField, F, FloatField, Func, Q,
+                              TextField, Value)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Upper
+
+REVIEW_SEARCH_CONFIG = 'russian'
+REVIEW_HEADLINE_OPTIONS = 'StartSel=<b>, StopSel=</b>, MaxFragments=2'
+
+_trigram_available = {}
+
+
+class TrigramWordSimilar(PostgresSimpleLookup):
+    """Похожесть строки запроса на любое слово в значении поля (pg_trgm)."""
+    lookup_name = 'trigram_word_similar'
+    operator = '%%>'
+
+
+class TrigramWordSimilarity(Func):
+    function = 'WORD_SIMILARITY'
+    output_field = FloatField()
+
+    def __init__(self, string, expression, **extra):
+        super().__init__(Value(string), expression, **extra)
+
+
+CharField.register_lookup(Upper)
+CharField.register_lookup(TrigramWordSimilar)
+
+
+def trigram_available(alias):
+    """Проверяет, установлено ли расширение pg_trgm в базе данных."""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return False
+    if alias not in _trigram_available:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+            )
+            _trigram_available[alias] = cursor.fetchone() is not None
+    return _trigram_available[alias]
+
+
+def trigram_search(queryset, field, query):
+    """Поиск по вхождению или с учетом опечаток, отсортированный
+    по похожести. Оба условия используют GIN-индекс
+    по UPPER(field) gin_trgm_ops.
+    """
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    query = query.upper()
+    return queryset.filter(
+        Q(**{f'{field}__upper__trigram_word_similar': query})
+        | Q(**{f'{field}__icontains': query})
+    ).annotate(
+        search_rank=TrigramWordSimilarity(query, Upper(field))
+    ).order_by('-search_rank', *ordering)
+
+
+def review_search_available(alias):
+    """Полнотекстовый поиск по отзывам поддерживается только в PostgreSQL."""
+    return connections[alias].vendor == 'postgresql'
+
+
+def search_reviews(queryset, query):
+    """Полнотекстовый поиск по тексту отзывов с ранжированием
+    и выделением найденных слов. Использует колонку search_vector,
+    которую поддерживает триггер, и GIN-индекс по ней.
+    В остальных базах данных ищет по вхождению строки.
+    """
+    if not review_search_available(queryset.db):
+        return queryset.filter(text__icontains=query).annotate(
+            search_rank=Value(None, output_field=FloatField()),
+            search_headline=F('text'),
+        )
+    tsquery = 'plainto_tsquery(%s::regconfig, %s)'
+    vector = '"reviews_review"."search_vector"'
+    params = (REVIEW_SEARCH_CONFIG, query)
+    return queryset.annotate(
+        search_match=RawSQL(f'{vector} @@ {tsquery}', params,
+                            output_field=BooleanField()),
+    ).filter(search_match=True).annotate(
+        search_rank=RawSQL(f'ts_rank({vector}, {tsquery})', params,
+                           output_field=FloatField()),
+        search_headline=RawSQL(
+            f'ts_headline(%s::regconfig, "reviews_review"."text", '
+            f'{tsquery}, %s)',
+            (REVIEW_SEARCH_CONFIG, *params, REVIEW_HEADLINE_OPTIONS),
+            output_field=TextField(),
+        ),
+    ).order_by('-search_rank', '-pub_date', '-id')
@@ -0,0 +1,90 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleScoreStats)
+from reviews.versions import bump_versions
+
+
+@receiver(pre_delete, sender=Review)
+def review_deleting(sender, instance, **kwargs):
+    """Блокирует строку удаляемого отзыва до конца удаления и запоминает
+    сохраненные произведение и оценку: объект в памяти мог устареть,
+    если отзыв изменили после его загрузки.
+    """
+    instance._saved_score = Review.objects.select_for_update().filter(
+        pk=instance.pk
+    ).values_list('title_id', 'score').first()
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Вычитает оценку удаленного отзыва из рейтинга и распределения
+    оценок произведения.
+    Срабатывает и при каскадном удалении произведения или автора.
+    Отзыв, уже удаленный параллельным запросом, не учитывается повторно.
+    """
+    saved = getattr(instance, '_saved_score', None)
+    if saved is None:
+        return
+    title_id, score = saved
+    Title.update_score(title_id, -score, -1)
+    TitleScoreStats.shift(title_id, removed=score)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Review)
+def catalogue_changed(sender, **kwargs):
+    """Сбрасывает закешированные ответы, зависящие от измененной модели."""
+    bump_versions(sender._meta.model_name)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Отмечает изменение произведений, у которых изменился набор жанров.
+    При очистке жанра произведения отмечаются до удаления связей.
+    """
+    if reverse and action == 'pre_clear':
+        titles = Title.objects.filter(genre=instance)
+    elif action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    elif reverse:
+        titles = Title.objects.filter(pk__in=pk_set or ())
+    else:
+        titles = Title.objects.filter(pk=instance.pk)
+    titles.update(modified=timezone.now())
+    bump_versions(Title._meta.model_name)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def genre_changed(sender, instance, **kwargs):
+    """Отмечает изменение произведений при изменении или удалении жанра."""
+    Title.objects.filter(genre=instance).update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """Отмечает изменение произведений при изменении или удалении
+    категории.
+    """
+    Title.objects.filter(category=instance).update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    """Отмечает изменение списка комментариев во времени изменения отзыва."""
+    Review.objects.filter(pk=instance.review_id).update(
+        modified=timezone.now()
+    )
@@ -0,0 +1,49 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'data-version:{}'
+BUMPED_KEY = 'data-bumped:{}'
+
+
+def get_versions(*names):
+    """Возвращает текущие версии данных для указанных моделей.
+    Отсутствующая в кеше версия инициализируется текущим временем,
+    чтобы после вытеснения ключа не совпасть со старым значением.
+    """
+    keys = [VERSION_KEY.format(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*names):
+    """Увеличивает версии данных для указанных моделей после фиксации
+    текущей транзакции. Иначе запрос, пришедший до фиксации, прочитал бы
+    новую версию вместе со старыми строками и закешировал бы старый
+    ответ под новым ключом. Вне транзакции версии меняются сразу.
+    """
+    transaction.on_commit(lambda: store_versions(names))
+
+
+def store_versions(names):
+    """Увеличивает версии данных и запоминает время изменения."""
+    cache.set_many({BUMPED_KEY.format(name): time.time() for name in names},
+                   timeout=None)
+    for name in names:
+        key = VERSION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            get_versions(name)
+            cache.incr(key)
+
+
+def changed_within(names, seconds):
+    """Менялись ли данные указанных моделей за последние seconds секунд."""
+    bumped = cache.get_many([BUMPED_KEY.format(name) for name in names])
+    return any(time.time() - moment < seconds for moment in bumped.values())
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from users.models import CustomUser
+
+USER_STATE_KEY = 'user-state:{}'
+USER_CACHE_KEY = 'user:{}'
+DELETED_STATE = {'is_active': False}
+
+
+def load_user_state(user_id):
+    """Роль, имя и активность пользователя из базы данных;
+    для удаленного пользователя - запрет аутентификации.
+    """
+    state = CustomUser.objects.filter(pk=user_id).values(
+        'username', 'role', 'is_active'
+    ).first()
+    return DELETED_STATE if state is None else state
+
+
+def get_user_state(user_id):
+    """Актуальные роль, имя и активность пользователя.
+    Кеш только ускоряет проверку: при его промахе состояние читается
+    из базы данных, поэтому вытеснение ключа или перезапуск memcached
+    не возвращают устаревшие claims выданных токенов. Состояние в кеше
+    живет USER_STATE_TIMEOUT секунд - это и предел его устаревания,
+    если запись в кеш после изменения пользователя не удалась.
+    """
+    key = USER_STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = load_user_state(user_id)
+        cache.set(key, state, timeout=settings.USER_STATE_TIMEOUT)
+    return state
+
+
+def remember_user_state(user):
+    """Обновляет состояние пользователя в кеше после фиксации
+    транзакции, чтобы параллельный запрос не закешировал старое.
+    """
+    state = {'username': user.username, 'role': user.role,
+             'is_active': user.is_active}
+    transaction.on_commit(lambda: store_user_state(user.pk, state))
+
+
+def forget_user(user_id):
+    """Запрещает аутентификацию удаленного пользователя."""
+    transaction.on_commit(lambda: store_user_state(user_id, DELETED_STATE))
+
+
+def store_user_state(user_id, state):
+    cache.set(USER_STATE_KEY.format(user_id), state,
+              timeout=settings.USER_STATE_TIMEOUT)
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+def get_cached_user(user_id):
+    return cache.get(USER_CACHE_KEY.format(user_id))
+
+
+def cache_user(user):
+    cache.set(USER_CACHE_KEY.format(user.pk), user,
+              timeout=settings.USER_CACHE_TIMEOUT)
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from asgiref.testing import ApplicationCommunicator
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from api_yamdb.asgi import application
+
+
+async def serve(path):
+    communicator = ApplicationCommunicator(application, {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'host', b'testserver')],
+    })
+    await communicator.send_input({'type': 'http.request'})
+    start = await communicator.receive_output(timeout=10)
+    while (await communicator.receive_output(timeout=10)).get('more_body'):
+        pass
+    await communicator.wait(timeout=10)
+    return start['status']
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsgiApplication:
+
+    def test_connections_released(self, settings):
+        settings.API_FAST_READ_PATH = False
+        opened = []
+        released = []
+
+        def on_created(sender, connection, **kwargs):
+            opened.append(connection)
+
+        def on_finished(sender, **kwargs):
+            released.append(connection.connection is None)
+
+        connection_created.connect(on_created)
+        request_finished.connect(on_finished)
+        try:
+            for _ in range(2):
+                cache.clear()
+                status = asyncio.run(serve('/api/v1/categories/'))
+                assert status == 200
+        finally:
+            connection_created.disconnect(on_created)
+            request_finished.disconnect(on_finished)
+        assert opened, 'Проверьте, что запросы через ASGI читают базу'
+        assert released == [True, True], (
+            'Проверьте, что ASGI-приложение закрывает ответ и после каждого '
+            'запроса соединение с базой освобождается'
+        )
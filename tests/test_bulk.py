@@ -0,0 +1,74 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from changes.models import Change
+from reviews.models import Category, Genre, Title
+from reviews.versions import get_versions
+from users.models import CustomUser
+
+URL = '/api/v1/titles/bulk/'
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    client.force_authenticate(
+        CustomUser.objects.create(username='admin', email='admin@yamdb.ru',
+                                  role='admin')
+    )
+    return client
+
+
+@pytest.fixture
+def title():
+    Genre.objects.create(name='Драма', slug='drama')
+    return Title.objects.create(
+        name='Война и мир', year=1869,
+        category=Category.objects.create(name='Книги', slug='book'),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleBulk:
+
+    def test_update_locks_titles(self, client, title):
+        items = [{'id': title.pk, 'name': 'Анна Каренина'},
+                 {'name': 'Воскресение', 'year': 1899, 'genre': ['drama'],
+                  'category': 'book'}]
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(URL, items, format='json')
+        assert response.status_code == 200
+        locks = [query['sql'] for query in context.captured_queries
+                 if 'FOR UPDATE' in query['sql']]
+        assert len(locks) == 1 and '"reviews_title"' in locks[0], (
+            'Проверьте, что изменяемые произведения блокируются '
+            'в транзакции пакета'
+        )
+        title.refresh_from_db()
+        assert title.name == 'Анна Каренина'
+
+    def test_best_effort_all_invalid(self, client, title):
+        cache.clear()
+        version = get_versions('title')
+        changes = Change.objects.count()
+        items = [{'id': title.pk, 'year': 3000},
+                 {'name': 'Воскресение', 'year': 1899, 'genre': ['nope'],
+                  'category': 'book'}]
+        response = client.post(f'{URL}?mode=best_effort', items,
+                               format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что пакет best_effort без корректных элементов '
+            'возвращает статус 400'
+        )
+        assert [result['status'] for result in response.data['results']] == [
+            'error', 'error'
+        ]
+        assert get_versions('title') == version, (
+            'Проверьте, что пакет без записи не меняет версию данных'
+        )
+        assert Change.objects.count() == changes, (
+            'Проверьте, что пакет без записи не пишет журнал изменений'
+        )
@@ -0,0 +1,28 @@
+import pytest
+
+from changes.log import compact_changes
+from changes.models import Change
+
+
+@pytest.mark.django_db
+class TestCompactChanges:
+
+    @pytest.mark.parametrize('batch_size', (1, 3, 100))
+    def test_keeps_latest(self, batch_size):
+        Change.objects.bulk_create(
+            Change(model=model, key=str(key))
+            for _ in range(3)
+            for model in (Change.TITLE, Change.REVIEW)
+            for key in range(5)
+        )
+        latest = {}
+        for pk, model, key in Change.objects.values_list('id', 'model',
+                                                         'key'):
+            latest[model, key] = max(pk, latest.get((model, key), 0))
+        assert compact_changes(batch_size=batch_size) == 20
+        assert set(Change.objects.values_list('id', flat=True)) == set(
+            latest.values()
+        ), (
+            'Проверьте, что сжатие журнала оставляет только последнюю '
+            'запись каждого объекта'
+        )
@@ -0,0 +1,67 @@
+import datetime
+import time
+
+import pytest
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Title
+from users.models import CustomUser
+
+
+@pytest.fixture
+def admin_client():
+    client = APIClient()
+    client.force_authenticate(CustomUser.objects.create(
+        username='admin', email='admin@yamdb.ru', role='admin'
+    ))
+    return client
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+
+    @pytest.mark.parametrize('query', ('', '?expand=reviews,stats',
+                                       '?format=json', '?fields=id,name'))
+    def test_if_match_from_any_variant(self, admin_client, query):
+        category = Category.objects.create(name='Фильмы', slug='movie')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        url = f'/api/v1/titles/{title.pk}/'
+        etag = admin_client.get(f'{url}{query}')['ETag']
+        response = admin_client.patch(url, {'name': 'Новое название'},
+                                      format='json', HTTP_IF_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Проверьте, что ETag из ответа на {url}{query} подходит для '
+            'If-Match при изменении того же объекта'
+        )
+        response = admin_client.delete(url, HTTP_IF_MATCH=etag)
+        assert response.status_code == 412, (
+            'Проверьте, что If-Match с ETag измененного объекта '
+            'возвращает статус 412'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_updates_within_second(self, admin_client):
+        title = Title.objects.create(name='Фильм', year=2000)
+        url = f'/api/v1/titles/{title.pk}/'
+        past = timezone.now() - datetime.timedelta(minutes=1)
+        Title.objects.filter(pk=title.pk).update(modified=past)
+        response = admin_client.get(url)
+        assert response['Last-Modified'] == http_date(int(past.timestamp()))
+        time.sleep(1 - time.time() % 1)
+        for name in ('Первое название', 'Второе название'):
+            assert admin_client.patch(url, {'name': name},
+                                      format='json').status_code == 200
+            response = admin_client.get(url)
+        title.refresh_from_db()
+        assert response.get('Last-Modified') is None
+        response = admin_client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(
+            int(title.modified.timestamp())
+        ))
+        assert response.status_code == 200, (
+            'Проверьте, что после двух изменений в одну секунду '
+            'If-Modified-Since не возвращает 304 со старым ответом'
+        )
+        assert response.data['name'] == 'Второе название'
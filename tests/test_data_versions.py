@@ -0,0 +1,48 @@
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+
+from reviews.models import Category, Genre, Review, Title
+from reviews.versions import get_versions
+from users.models import CustomUser
+
+
+@pytest.mark.django_db(transaction=True)
+class TestDataVersions:
+
+    def test_bumped_after_commit(self):
+        cache.clear()
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        author = CustomUser.objects.create(username='user',
+                                           email='user@yamdb.ru')
+        with transaction.atomic():
+            title = Title.objects.create(
+                name='Фильм', year=2000,
+                category=Category.objects.create(name='Фильмы',
+                                                 slug='movie'),
+            )
+            title.genre.set([genre])
+            before = get_versions('title', 'category')
+            Review.objects.create(title=title, author=author, text='Отзыв',
+                                  score=5)
+            assert get_versions('title', 'category', 'review')[:2] == before, (
+                'Проверьте, что версии данных не меняются до фиксации '
+                'транзакции'
+            )
+            review_version = get_versions('review')
+        after = get_versions('title', 'category', 'review')
+        assert after[0] > before[0] and after[1] > before[1], (
+            'Проверьте, что версии данных меняются после фиксации транзакции'
+        )
+        assert after[2] > review_version[0]
+
+    def test_not_bumped_on_rollback(self):
+        cache.clear()
+        before = get_versions('genre')
+        with pytest.raises(ValueError):
+            with transaction.atomic():
+                Genre.objects.create(name='Драма', slug='drama')
+                raise ValueError
+        assert get_versions('genre') == before, (
+            'Проверьте, что отмененная транзакция не меняет версии данных'
+        )
@@ -0,0 +1,120 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.v1.renderers import ORJSONRenderer
+from reviews.models import Category, Genre, Review, Title
+from users.models import CustomUser
+
+INDENT = 'application/json; indent=4'
+
+
+@pytest.fixture
+def catalogue():
+    movie = Category.objects.create(name='Фильмы', slug='movie')
+    book = Category.objects.create(name='Книги', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    rock = Genre.objects.create(name='Рок "в кавычках"', slug='rock')
+    authors = CustomUser.objects.bulk_create(
+        CustomUser(username=f'user{i}', email=f'user{i}@yamdb.ru')
+        for i in range(3)
+    )
+    titles = [
+        Title.objects.create(name='Война и мир', year=1869, category=book,
+                             description='Роман-эпопея\u2028в\u2029томах'),
+        Title.objects.create(name='Фильм без категории', year=2001),
+        Title.objects.create(name='Комедия', year=2010, category=movie),
+        Title.objects.create(name='Драма', year=2011, category=movie,
+                             description=''),
+    ]
+    Title.objects.bulk_create(
+        Title(name=f'Альбом {year}', year=year, category=movie)
+        for year in range(1990, 1993)
+    )
+    titles[0].genre.set([drama, comedy, rock])
+    titles[2].genre.set([comedy])
+    titles[3].genre.set([drama])
+    for author, score in zip(authors, (10, 7, 4)):
+        Review.objects.create(title=titles[0], author=author, text='Отзыв',
+                              score=score)
+    Review.objects.create(title=titles[2], author=authors[0], text='Отзыв',
+                          score=1)
+    return titles
+
+
+@pytest.mark.django_db
+class TestFastReadPath:
+
+    def get(self, url, fast, settings, **headers):
+        settings.API_FAST_READ_PATH = fast
+        cache.clear()
+        response = APIClient().get(url, **headers)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к {url} возвращает статус 200'
+        )
+        return response.content
+
+    def test_same_output(self, catalogue, settings):
+        title = catalogue[0]
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?page=2',
+            '/api/v1/titles/?genre=drama',
+            '/api/v1/titles/?category=movie&year=2010',
+            '/api/v1/titles/?genre=drama,comedy',
+            '/api/v1/titles/?genre=drama,comedy&genre_mode=all',
+            '/api/v1/titles/?category=movie,book&year_min=1991&year_max=2010',
+            '/api/v1/titles/?search=Война',
+            '/api/v1/titles/?fields=id,name,rating',
+            '/api/v1/titles/?fields=genre,category',
+            f'/api/v1/titles/{title.pk}/',
+            f'/api/v1/titles/{catalogue[1].pk}/',
+            f'/api/v1/titles/{title.pk}/?fields=id,genre',
+            '/api/v1/genres/',
+            '/api/v1/genres/?search=Драма',
+            '/api/v1/categories/',
+        )
+        for url in urls:
+            assert (self.get(url, True, settings)
+                    == self.get(url, False, settings)), (
+                f'Проверьте, что быстрый ответ на {url} совпадает '
+                'с ответом сериалайзера'
+            )
+            indented = self.get(url, True, settings, HTTP_ACCEPT=INDENT)
+            assert indented == self.get(url, False, settings,
+                                        HTTP_ACCEPT=INDENT), (
+                f'Проверьте, что быстрый ответ на {url} с отступами '
+                'совпадает с ответом сериалайзера'
+            )
+
+    def test_missing_title(self, catalogue, settings):
+        settings.API_FAST_READ_PATH = True
+        assert APIClient().get('/api/v1/titles/0/').status_code == 404
+
+    def test_renderer(self, catalogue, settings):
+        settings.API_FAST_READ_PATH = False
+        cache.clear()
+        url = f'/api/v1/titles/{catalogue[0].pk}/'
+        data = APIClient().get(url).data
+        content = ORJSONRenderer().render(data)
+        assert content == JSONRenderer().render(data), (
+            'Проверьте, что ORJSONRenderer выводит тот же JSON, '
+            'что и JSONRenderer'
+        )
+        assert b'\\u2028' in content and b'\\u2029' in content, (
+            'Проверьте, что ORJSONRenderer экранирует U+2028 и U+2029'
+        )
+        for media_type, context in ((INDENT, None), (None, {'indent': 4})):
+            assert (ORJSONRenderer().render(data, media_type, context)
+                    == JSONRenderer().render(data, media_type, context)), (
+                'Проверьте, что ORJSONRenderer выводит JSON с отступами, '
+                'как JSONRenderer'
+            )
+        cache.clear()
+        response = APIClient().get(url, HTTP_ACCEPT=INDENT)
+        assert response.content == JSONRenderer().render(data, INDENT), (
+            'Проверьте, что на Accept с indent=4 API отвечает JSON '
+            'с отступами'
+        )
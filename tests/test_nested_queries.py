@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Comment, Review, Title
+from users.models import CustomUser
+
+# Запрос версии для условного GET, который заодно проверяет родителя,
+# COUNT(*) постраничной пагинации и выборка страницы вместе с авторами.
+PAGE_QUERIES = 3
+CURSOR_QUERIES = 2
+
+
+@pytest.fixture
+def review():
+    category = Category.objects.create(name='Фильмы', slug='movie')
+    title = Title.objects.create(name='Фильм', year=2000, category=category)
+    authors = CustomUser.objects.bulk_create(
+        CustomUser(username=f'user{i}', email=f'user{i}@yamdb.ru')
+        for i in range(20)
+    )
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text='Отзыв', score=5)
+        for author in authors
+    )
+    review = Review.objects.filter(title=title).first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=author, text='Комментарий')
+        for author in authors
+    )
+    return review
+
+
+@pytest.mark.django_db
+class TestNestedQueries:
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = APIClient().get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к {url} возвращает статус 200'
+        )
+        return len(context.captured_queries)
+
+    def urls(self, review):
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        return (reviews_url, f'{reviews_url}{review.pk}/comments/')
+
+    @pytest.mark.parametrize('page_size', (1, 5, 50))
+    def test_list_queries(self, review, page_size, monkeypatch):
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+        for url in self.urls(review):
+            assert self.count_queries(url) == PAGE_QUERIES, (
+                f'Проверьте, что список {url} читается за {PAGE_QUERIES} '
+                f'запроса при размере страницы {page_size}'
+            )
+
+    def test_cursor_list_queries(self, review):
+        for url in self.urls(review):
+            assert self.count_queries(
+                f'{url}?pagination=cursor'
+            ) == CURSOR_QUERIES, (
+                f'Проверьте, что курсорная страница {url} читается за '
+                f'{CURSOR_QUERIES} запроса'
+            )
+
+    def test_missing_parent(self, review):
+        client = APIClient()
+        urls = (
+            '/api/v1/titles/0/reviews/',
+            f'/api/v1/titles/0/reviews/{review.pk}/comments/',
+            f'/api/v1/titles/{review.title_id}/reviews/0/comments/',
+        )
+        for url in urls:
+            assert client.get(url).status_code == 404, (
+                f'Проверьте, что GET-запрос к {url} возвращает статус 404'
+            )
@@ -0,0 +1,50 @@
+import datetime
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from outbox.models import Email
+
+
+def create_email(**kwargs):
+    return Email.objects.create(subject='Код', body='123',
+                                from_email='webmaster@localhost',
+                                recipient='user@yamdb.ru', **kwargs)
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_expired_lease(self, settings):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        now = timezone.now()
+        expired = create_email(status=Email.SENDING,
+                               next_attempt_at=now - datetime.timedelta(1))
+        leased = create_email(status=Email.SENDING,
+                              next_attempt_at=now + datetime.timedelta(1))
+        call_command('sendemails')
+        expired.refresh_from_db()
+        leased.refresh_from_db()
+        assert expired.status == Email.SENT and expired.attempts == 1, (
+            'Проверьте, что письмо упавшего воркера отправляется '
+            'после окончания аренды'
+        )
+        assert leased.status == Email.SENDING and len(mail.outbox) == 1, (
+            'Проверьте, что письмо в аренде другого воркера не отправляется'
+        )
+
+    def test_zero_retry_delay(self, settings):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+        settings.EMAIL_HOST = '127.0.0.1'
+        settings.EMAIL_PORT = 1
+        settings.OUTBOX_RETRY_DELAY = 0
+        email = create_email()
+        call_command('sendemails', batch_size=1)
+        email.refresh_from_db()
+        assert email.status == Email.PENDING and email.attempts == 1, (
+            'Проверьте, что при OUTBOX_RETRY_DELAY=0 разбор очереди '
+            'не повторяет неудачную отправку в том же вызове'
+        )
+        assert email.last_error
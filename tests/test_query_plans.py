@@ -0,0 +1,149 @@
+import json
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from rankings.compute import refresh_rankings
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.search import review_search_available, trigram_available
+from users.models import CustomUser
+
+# Таблицы, которые растут вместе с каталогом и отзывами: чтение
+# из них целиком на каждый запрос недопустимо.
+LARGE_TABLES = {
+    'reviews_title', 'reviews_title_genre', 'reviews_review',
+    'reviews_comment', 'reviews_titlescorestats', 'users_customuser',
+    'changes_change', 'rankings_ranking', 'rankings_rankingentry',
+}
+
+
+@pytest.fixture
+def review():
+    categories = [Category.objects.create(name=f'Категория {i}',
+                                          slug=f'category{i}')
+                  for i in range(3)]
+    genres = [Genre.objects.create(name=f'Жанр {i}', slug=f'genre{i}')
+              for i in range(3)]
+    authors = CustomUser.objects.bulk_create(
+        CustomUser(username=f'user{i}', email=f'user{i}@yamdb.ru')
+        for i in range(5)
+    )
+    titles = []
+    for i in range(30):
+        title = Title.objects.create(name=f'Произведение {i}',
+                                     year=1990 + i % 10,
+                                     category=categories[i % 3])
+        title.genre.set(genres[:i % 3 + 1])
+        titles.append(title)
+    for title in titles[:10]:
+        for author in authors:
+            review = Review.objects.create(title=title, author=author,
+                                           text='Хороший фильм', score=7)
+            Comment.objects.create(review=review, author=author,
+                                   text='Согласен')
+    refresh_rankings(size=10, min_votes=1)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return review
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from plan_nodes(child)
+
+
+def seq_scans(sql):
+    """Большие таблицы, которые запрос читает последовательно, даже когда
+    планировщику запрещено выбирать Seq Scan при наличии индекса.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+        plan = cursor.fetchone()[0]
+        cursor.execute('SET LOCAL enable_seqscan = on')
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return {node['Relation Name'] for node in plan_nodes(plan[0]['Plan'])
+            if node['Node Type'] == 'Seq Scan'
+            and node['Relation Name'] in LARGE_TABLES}
+
+
+@pytest.mark.skipif(connection.vendor != 'postgresql',
+                    reason='Планы запросов проверяются в PostgreSQL')
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    def urls(self, review):
+        title = review.title_id
+        reviews = f'/api/v1/titles/{title}/reviews/'
+        comments = f'{reviews}{review.pk}/comments/'
+        urls = [
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            '/api/v1/titles/',
+            '/api/v1/titles/?page=2',
+            '/api/v1/titles/?genre=genre2',
+            '/api/v1/titles/?category=category1',
+            '/api/v1/titles/?category=category1&genre=genre1',
+            '/api/v1/titles/?year=1995',
+            '/api/v1/titles/?genre=genre0,genre1',
+            '/api/v1/titles/?genre=genre0,genre1&genre_mode=all',
+            '/api/v1/titles/?category=category0,category2&year_min=1995',
+            '/api/v1/titles/?year_min=1992&year_max=1994',
+            f'/api/v1/titles/{title}/',
+            f'/api/v1/titles/{title}/?expand=reviews,stats',
+            reviews,
+            f'{reviews}?pagination=cursor',
+            f'{reviews}{review.pk}/',
+            comments,
+            f'{comments}?pagination=cursor',
+            f'{comments}{review.comments.first().pk}/',
+            '/api/v1/rankings/genre/genre0/',
+            '/api/v1/rankings/year/1995/',
+            '/api/v1/users/',
+            '/api/v1/users/user1/',
+            '/api/v1/users/me/',
+            '/api/v1/changes/',
+            '/api/v1/changes/?since=10&limit=5',
+            '/api/v1/export/reviews/?since=2020-01-01',
+        ]
+        if trigram_available(connection.alias):
+            urls += ['/api/v1/titles/?name=Произв',
+                     '/api/v1/titles/?search=Произв',
+                     '/api/v1/genres/?search=Жанр']
+        if review_search_available(connection.alias):
+            urls.append('/api/v1/reviews/search/?q=фильм')
+        return urls
+
+    def get_queries(self, client, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к {url} возвращает статус 200'
+        )
+        return [query['sql'] for query in context.captured_queries
+                if query['sql'].lstrip().upper().startswith('SELECT')]
+
+    @pytest.mark.parametrize('fast_read_path', (True, False))
+    def test_no_seq_scans(self, review, fast_read_path, settings):
+        settings.API_FAST_READ_PATH = fast_read_path
+        settings.CHANGES_SETTLE_DELAY = 0
+        client = APIClient()
+        client.force_authenticate(
+            CustomUser.objects.create(username='admin', email='a@yamdb.ru',
+                                      role='admin')
+        )
+        for url in self.urls(review):
+            for sql in self.get_queries(client, url):
+                tables = seq_scans(sql)
+                assert not tables, (
+                    f'Проверьте индексы: запрос {url} читает таблицы '
+                    f'{", ".join(sorted(tables))} целиком:\n{sql}'
+                )
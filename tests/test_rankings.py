@@ -0,0 +1,32 @@
+import pytest
+
+from rankings.compute import compute_rankings, save_rankings
+from rankings.models import Ranking, RankingEntry
+from reviews.models import Category, Review, Title
+from users.models import CustomUser
+
+
+@pytest.mark.django_db
+class TestRankings:
+
+    def test_title_deleted_after_compute(self):
+        category = Category.objects.create(name='Фильмы', slug='movie')
+        author = CustomUser.objects.create(username='user',
+                                           email='user@yamdb.ru')
+        titles = [Title.objects.create(name=f'Фильм {score}', year=2000,
+                                       category=category)
+                  for score in (9, 7, 5)]
+        for title, score in zip(titles, (9, 7, 5)):
+            Review.objects.create(title=title, author=author, text='Отзыв',
+                                  score=score)
+        groups = compute_rankings(size=10, min_votes=1)
+        titles[0].delete()
+        Title.objects.create(name='Фильм без оценок', year=2001)
+        assert save_rankings(groups) == 2
+        entries = RankingEntry.objects.filter(
+            ranking__kind=Ranking.CATEGORY, ranking__key='movie'
+        ).values_list('position', 'title_id')
+        assert list(entries) == [(1, titles[1].pk), (2, titles[2].pk)], (
+            'Проверьте, что произведение, удаленное после расчета, '
+            'исключается из рейтинга, а места пересчитываются'
+        )
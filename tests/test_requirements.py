@@ -15,3 +15,13 @@ class TestRequirements:
         assert 'gunicorn' in requirements, 'Проверьте, что добавили gunicorn в файл requirements.txt'
         assert 'django' in requirements, 'Проверьте, что добавили django в файл requirements.txt'
         assert 'pytest-django' in requirements, 'Проверьте, что добавили pytest-django в файл requirements.txt'
+
+    def test_asgi_requirements(self):
+        with open(os.path.join(settings.BASE_DIR, 'requirements.txt')) as f:
+            pinned = {line.split('==')[0].strip().lower()
+                      for line in f if '==' in line}
+        for package in ('asgiref', 'uvicorn'):
+            assert package in pinned, (
+                f'Проверьте, что версия {package} для api_yamdb/asgi.py '
+                'закреплена в файле requirements.txt'
+            )
@@ -0,0 +1,95 @@
+from collections import Counter
+
+import pytest
+
+from reviews.models import SCORES, Review, Title, TitleScoreStats
+from users.models import CustomUser
+
+
+@pytest.fixture
+def authors():
+    return [CustomUser.objects.create(username=f'user{i}',
+                                      email=f'user{i}@yamdb.ru')
+            for i in range(3)]
+
+
+@pytest.fixture
+def titles():
+    return [Title.objects.create(name=f'Произведение {i}', year=2000)
+            for i in range(2)]
+
+
+def review(title, author, score):
+    return Review.objects.create(title=title, author=author, text='Отзыв',
+                                 score=score)
+
+
+def assert_scores(title, scores):
+    title.refresh_from_db()
+    assert (title.score_sum, title.score_count) == (sum(scores), len(scores))
+    assert title.rating == (sum(scores) // len(scores) if scores else None)
+    stats = TitleScoreStats.objects.filter(pk=title.pk).first()
+    histogram = stats.histogram if stats else dict.fromkeys(SCORES, 0)
+    counts = Counter(scores)
+    assert histogram == {score: counts[score] for score in SCORES}, (
+        f'Проверьте распределение оценок произведения {title}'
+    )
+
+
+@pytest.mark.django_db
+class TestReviewScores:
+
+    def test_create(self, titles, authors):
+        review(titles[0], authors[0], 8)
+        review(titles[0], authors[1], 3)
+        assert_scores(titles[0], [8, 3])
+        assert_scores(titles[1], [])
+
+    def test_change_score(self, titles, authors):
+        first = review(titles[0], authors[0], 8)
+        review(titles[0], authors[1], 3)
+        first.score = 10
+        first.save()
+        assert_scores(titles[0], [10, 3])
+
+    def test_move_to_title(self, titles, authors):
+        first = review(titles[0], authors[0], 8)
+        review(titles[0], authors[1], 3)
+        first.title = titles[1]
+        first.score = 5
+        first.save()
+        assert_scores(titles[0], [3])
+        assert_scores(titles[1], [5])
+
+    def test_delete(self, titles, authors):
+        first = review(titles[0], authors[0], 8)
+        review(titles[0], authors[1], 3)
+        first.delete()
+        assert_scores(titles[0], [3])
+
+    def test_delete_stale_instance(self, titles, authors):
+        first = review(titles[0], authors[0], 8)
+        review(titles[0], authors[1], 3)
+        fresh = Review.objects.get(pk=first.pk)
+        fresh.score = 2
+        fresh.save()
+        first.delete()
+        assert_scores(titles[0], [3])
+        fresh.delete()
+        assert_scores(titles[0], [3])
+
+    def test_cascade_author(self, titles, authors):
+        review(titles[0], authors[0], 8)
+        review(titles[1], authors[0], 6)
+        review(titles[0], authors[1], 3)
+        authors[0].delete()
+        assert_scores(titles[0], [3])
+        assert_scores(titles[1], [])
+
+    def test_cascade_title(self, titles, authors):
+        review(titles[0], authors[0], 8)
+        review(titles[1], authors[0], 6)
+        review(titles[1], authors[1], 3)
+        titles[0].delete()
+        assert not TitleScoreStats.objects.filter(pk=titles[0].pk).exists()
+        assert_scores(titles[1], [6, 3])
@@ -0,0 +1,124 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from api.v1.throttling import BUCKET_KEY, take_token
+
+CAPACITY = 3
+DURATION = 60
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def take(now, key='bucket'):
+    return take_token(key, CAPACITY, DURATION, now)
+
+
+class TestTakeToken:
+
+    def test_capacity_and_wait(self):
+        for _ in range(CAPACITY):
+            assert take(1000) is None
+        assert take(1000) == pytest.approx(DURATION / CAPACITY), (
+            'Проверьте, что после исчерпания корзины take_token '
+            'возвращает время до следующего токена'
+        )
+        assert take(1019) == pytest.approx(1)
+
+    def test_refill(self):
+        for _ in range(CAPACITY):
+            take(1000)
+        assert take(1020) is None, (
+            'Проверьте, что корзина пополняется со скоростью '
+            'capacity/duration'
+        )
+        assert take(1020) is not None
+
+    def test_refill_clamped(self):
+        take(1000)
+        for _ in range(CAPACITY):
+            assert take(100000) is None
+        assert take(100000) is not None, (
+            'Проверьте, что за время простоя в корзине не накапливается '
+            'больше capacity токенов'
+        )
+
+    def test_keys_independent(self):
+        for _ in range(CAPACITY):
+            take(1000)
+        assert take(1000, key='other') is None
+
+    def test_counter_expired_before_decr(self, monkeypatch):
+        for _ in range(CAPACITY):
+            take(1000)
+
+        def decr(key, delta=1, version=None):
+            raise ValueError(key)
+
+        monkeypatch.setattr(cache, 'decr', decr)
+        assert take(1000) is not None
+
+    def test_counter_lost(self):
+        for _ in range(CAPACITY):
+            take(1000)
+        cache.delete(BUCKET_KEY.format('bucket', 'count'))
+        assert take(1000) is None
+
+
+@pytest.mark.django_db
+class TestAuthThrottling:
+    url = '/api/v1/auth/token/'
+
+    def set_rates(self, settings, num_proxies=0, **rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'NUM_PROXIES': num_proxies,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+                **rates,
+            },
+        }
+
+    def test_too_many_requests(self, settings):
+        self.set_rates(settings, auth_user='2/min', auth_ip='100/min')
+        client = APIClient()
+        data = {'username': 'nobody', 'confirmation_code': 'code'}
+        for _ in range(2):
+            assert client.post(self.url, data).status_code != 429
+        response = client.post(self.url, data)
+        assert response.status_code == 429, (
+            'Проверьте, что подбор кода для одного пользователя '
+            'ограничивается статусом 429'
+        )
+        assert int(response['Retry-After']) > 0
+
+    def test_not_mapping_body(self, settings):
+        self.set_rates(settings, auth_user='2/min')
+        for url in (self.url, '/api/v1/auth/signup/'):
+            response = APIClient().post(url, ['username'], format='json')
+            assert response.status_code == 400, (
+                f'Проверьте, что JSON-массив в теле запроса к {url} '
+                'возвращает статус 400'
+            )
+
+    @pytest.mark.parametrize('num_proxies,limited', ((0, True), (1, False)))
+    def test_forwarded_for(self, settings, num_proxies, limited):
+        self.set_rates(settings, num_proxies=num_proxies, auth_ip='2/min',
+                       auth_user='100/min')
+        client = APIClient(REMOTE_ADDR='10.0.0.1')
+        statuses = [
+            client.post(self.url, {'username': f'user{i}',
+                                   'confirmation_code': 'code'},
+                        HTTP_X_FORWARDED_FOR=f'192.0.2.{i}').status_code
+            for i in range(3)
+        ]
+        assert (statuses[-1] == 429) is limited, (
+            'Проверьте, что при NUM_PROXIES=0 подмененный X-Forwarded-For '
+            'не обходит лимит для REMOTE_ADDR, а при NUM_PROXIES=1 '
+            'адрес клиента берется из заголовка'
+        )
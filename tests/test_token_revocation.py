@@ -0,0 +1,52 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from api.v1.authentication import get_token_for_user
+from users.models import CustomUser
+
+
+@pytest.fixture
+def admin():
+    return CustomUser.objects.create(username='admin',
+                                     email='admin@yamdb.ru', role='admin')
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_token_for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTokenRevocation:
+    url = '/api/v1/users/'
+
+    def test_demoted_admin(self, admin):
+        client = client_for(admin)
+        assert client.get(self.url).status_code == 200
+        admin.role = CustomUser.USER
+        admin.save()
+        cache.clear()
+        assert client.get(self.url).status_code == 403, (
+            'Проверьте, что после понижения роли и очистки кеша токен '
+            'не дает прав администратора'
+        )
+
+    def test_blocked_and_deleted(self, admin):
+        client = client_for(admin)
+        admin.is_active = False
+        admin.save()
+        cache.clear()
+        assert client.get(self.url).status_code == 401, (
+            'Проверьте, что заблокированный пользователь не проходит '
+            'аутентификацию после очистки кеша'
+        )
+        admin.delete()
+        cache.clear()
+        assert client.get(self.url).status_code == 401, (
+            'Проверьте, что удаленный пользователь не проходит '
+            'аутентификацию после очистки кеша'
+        )